@@ -16,7 +16,9 @@ from shared_metrics_utils import (
     process_dataset, 
     analyze_impact,
     calculate_percent_increase,
-    safe_divide
+    safe_divide,
+    enable_debug_logging,
+    OUTPUT_FORMATS
 )
 
 def create_bola_visualizations(summary_df, impact_df, output_dir):
@@ -555,6 +557,8 @@ def main():
     parser.add_argument("--metadata", required=True, help="Master metadata JSON file")
     parser.add_argument("--output", default="analysis/bola", help="Output directory for analysis")
     parser.add_argument("--debug", action="store_true", help="Enable debug output")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="csv",
+                        help="File format of the summary and impact tables")
     
     args = parser.parse_args()
     
@@ -572,6 +576,7 @@ def main():
         return
     
     if args.debug:
+        enable_debug_logging()
         print(f"Metadata structure: {json.dumps(metadata, indent=2)}")
     
     # Process each fault scenario
@@ -622,7 +627,7 @@ def main():
         
         # Analyze BOLA impact using standardized function
         print("Analyzing BOLA attack impact...")
-        summary_df, impact_df = analyze_impact(all_data, output_dir, "bola")
+        summary_df, impact_df = analyze_impact(all_data, output_dir, "bola", args.output_format)
         
         # Create BOLA-specific visualizations
         create_bola_visualizations(summary_df, impact_df, output_dir)
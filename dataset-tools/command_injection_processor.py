@@ -21,7 +21,9 @@ from shared_metrics_utils import (
     analyze_impact,
     calculate_percent_increase,
     safe_divide,
-    process_dataset
+    process_dataset,
+    enable_debug_logging,
+    OUTPUT_FORMATS
 )
 
 def process_command_injection_dataset(baseline_file, install_file, shell_file, recovery_file, fault_type):
@@ -70,7 +72,7 @@ def process_command_injection_dataset(baseline_file, install_file, shell_file, r
     
     return combined_df
 
-def analyze_command_injection_impact(df, output_dir):
+def analyze_command_injection_impact(df, output_dir, output_format="csv"):
     """Analyze the impact of command injection attacks across fault types"""
     if df.empty:
         print("WARNING: Empty dataframe, skipping command injection impact analysis")
@@ -91,7 +93,7 @@ def analyze_command_injection_impact(df, output_dir):
     analysis_df['standard_phase'] = analysis_df['phase'].map(phase_mapping)
     
     # Use the standardized analyze_impact function
-    summary_df, impact_df = analyze_impact(analysis_df, output_dir, 'command_injection')
+    summary_df, impact_df = analyze_impact(analysis_df, output_dir, 'command_injection', output_format)
     
     # Additional command-injection specific impact metrics
     # This adds metrics specifically for install vs shell phases
@@ -126,30 +128,35 @@ def calculate_command_injection_phases_impact(df, output_dir):
     mem_cols = [col for col in df.columns if col.startswith("memory_")]
     temp_dev_cols = [col for col in df.columns if "true_dev_" in col]
     
+    # Per-column means of every (fault type, phase) group in one grouped pass,
+    # so each fault's phases are looked up instead of masking the whole frame
+    metric_cols = list(dict.fromkeys(cpu_cols + mem_cols + temp_dev_cols))
+    phase_means = df.groupby(["vulnerability_type", "phase"], observed=True)[metric_cols].mean()
+    
+    def phase_average(fault, phase, cols):
+        """Average of the per-column means of one fault type's phase (KeyError when it has no rows)"""
+        return phase_means.loc[(fault, phase), cols].mean(skipna=False)
+    
     for fault in fault_types:
-        # Get data for each phase
-        baseline_df = df[(df["vulnerability_type"] == fault) & (df["phase"] == "baseline")]
-        install_df = df[(df["vulnerability_type"] == fault) & (df["phase"] == "install")]
-        shell_df = df[(df["vulnerability_type"] == fault) & (df["phase"] == "shell")]
-        
-        if baseline_df.empty or install_df.empty or shell_df.empty:
-            continue
-        
         # Calculate phase-specific metrics
         try:
             # Average metrics for each phase
-            baseline_cpu = np.mean([baseline_df[col].mean() for col in cpu_cols if col in baseline_df])
-            baseline_memory = np.mean([baseline_df[col].mean() for col in mem_cols if col in baseline_df])
-            baseline_temp_dev = np.mean([baseline_df[col].mean() for col in temp_dev_cols if col in baseline_df])
-            
-            install_cpu = np.mean([install_df[col].mean() for col in cpu_cols if col in install_df])
-            install_memory = np.mean([install_df[col].mean() for col in mem_cols if col in install_df])
-            install_temp_dev = np.mean([install_df[col].mean() for col in temp_dev_cols if col in install_df])
-            
-            shell_cpu = np.mean([shell_df[col].mean() for col in cpu_cols if col in shell_df])
-            shell_memory = np.mean([shell_df[col].mean() for col in mem_cols if col in shell_df])
-            shell_temp_dev = np.mean([shell_df[col].mean() for col in temp_dev_cols if col in shell_df])
-            
+            baseline_cpu = phase_average(fault, "baseline", cpu_cols)
+            baseline_memory = phase_average(fault, "baseline", mem_cols)
+            baseline_temp_dev = phase_average(fault, "baseline", temp_dev_cols)
+            
+            install_cpu = phase_average(fault, "install", cpu_cols)
+            install_memory = phase_average(fault, "install", mem_cols)
+            install_temp_dev = phase_average(fault, "install", temp_dev_cols)
+            
+            shell_cpu = phase_average(fault, "shell", cpu_cols)
+            shell_memory = phase_average(fault, "shell", mem_cols)
+            shell_temp_dev = phase_average(fault, "shell", temp_dev_cols)
+        except KeyError:
+            # Baseline, install or shell phase missing for this fault type
+            continue
+        
+        try:
             # Phase-specific impact metrics
             impact = {
                 'fault_type': fault,
@@ -639,6 +646,8 @@ def main():
     parser.add_argument("--metadata", required=True, help="Master metadata JSON file")
     parser.add_argument("--output", default="analysis/command_injection", help="Output directory for analysis")
     parser.add_argument("--debug", action="store_true", help="Enable debug output")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="csv",
+                        help="File format of the summary and impact tables")
     
     args = parser.parse_args()
     
@@ -656,6 +665,7 @@ def main():
         return
     
     if args.debug:
+        enable_debug_logging()
         print(f"Metadata structure: {json.dumps(metadata, indent=2)}")
     
     # Process each fault scenario
@@ -716,7 +726,7 @@ def main():
         
         # Analyze command injection impact
         print("\nAnalyzing command injection attack impact...")
-        summary_df, impact_df = analyze_command_injection_impact(all_data, output_dir)
+        summary_df, impact_df = analyze_command_injection_impact(all_data, output_dir, args.output_format)
         
         # Create time series visualizations
         print("Creating time series visualizations...")
@@ -62,7 +62,7 @@ class IoTDatasetCollector:
                 
         return data
     
-    def start_collection(self, event_name, duration=400, interval=5):
+    def start_collection(self, event_name, duration=400, interval=5, should_stop=None):
         """
         Collect data for a specific duration with regular intervals
         
@@ -70,6 +70,8 @@ class IoTDatasetCollector:
             event_name: Name of the event (used for dataset naming)
             duration: Collection duration in seconds
             interval: Collection interval in seconds
+            should_stop: Optional callable checked before every snapshot - the
+                collection ends early once it returns True
         """
         print(f"Starting data collection for event: {event_name}")
         print(f"Duration: {duration} seconds, Interval: {interval} seconds")
@@ -97,6 +99,10 @@ class IoTDatasetCollector:
         
         try:
             while time.time() < end_time:
+                if should_stop is not None and should_stop():
+                    print("\nCollection stopped early.")
+                    break
+                
                 start_loop = time.time()
                 
                 # Collect data
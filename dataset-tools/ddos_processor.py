@@ -2,24 +2,58 @@
 # enhanced_ddos_processor.py - DDoS processor with improved latency visualization
 
 import json
+import logging
 import pandas as pd
 import numpy as np
 import argparse
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import matplotlib.pyplot as plt
 import seaborn as sns
 import matplotlib.dates as mdates
 
+# orjson is optional - fall back to the stdlib json module when it is missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import the standardized utilities
 from shared_metrics_utils import (
     process_dataset, 
     analyze_impact,
     calculate_percent_increase,
-    safe_divide
+    safe_divide,
+    enable_debug_logging,
+    OUTPUT_FORMATS
 )
 
-def create_ddos_visualizations(summary_df, impact_df, output_dir):
+# Maximum number of rows echoed to the console for the summary tables
+SUMMARY_MAX_ROWS = 50
+
+# Grid styling for the latency reliability panels, applied through rcParams
+RELIABILITY_GRID_RC = {"axes.grid": True, "grid.alpha": 0.3}
+
+logger = logging.getLogger("ddos-processor")
+
+def prepare_figure(fig, figsize, layout=None):
+    """
+    Clear and resize a reusable Figure and make it the current pyplot figure,
+    so repeated plots share one renderer instead of allocating a new figure
+    each time. Creates a new figure when fig is None.
+    """
+    if fig is None:
+        return plt.figure(figsize=figsize, layout=layout)
+    
+    fig.clf()
+    fig.set_size_inches(figsize)
+    fig.set_layout_engine(layout)
+    plt.figure(fig.number)
+    return fig
+
+def create_ddos_visualizations(summary_df, impact_df, output_dir, fig=None):
     """Create DDoS-specific visualizations from summary and impact data"""
     if summary_df.empty or impact_df.empty:
         print("WARNING: Empty dataframes, skipping DDoS visualizations")
@@ -27,7 +61,7 @@ def create_ddos_visualizations(summary_df, impact_df, output_dir):
     
     try:
         # Resource usage comparison by fault type and phase
-        plt.figure(figsize=(15, 10))
+        fig = prepare_figure(fig, (15, 10))
         
         # CPU usage by fault type and phase
         plt.subplot(2, 1, 1)
@@ -51,7 +85,7 @@ def create_ddos_visualizations(summary_df, impact_df, output_dir):
         print("Created resource usage visualization")
         
         # Response Latency by fault type and phase (NEW)
-        plt.figure(figsize=(10, 6))
+        fig = prepare_figure(fig, (10, 6))
         if 'avg_latency_ms' in summary_df.columns:
             chart_data = summary_df.pivot_table(index='fault_type', columns='phase', values='avg_latency_ms')
             chart_data.plot(kind='bar', ax=plt.gca())
@@ -63,7 +97,7 @@ def create_ddos_visualizations(summary_df, impact_df, output_dir):
             print("Created latency visualization")
         
         # Impact comparison
-        plt.figure(figsize=(15, 12))
+        fig = prepare_figure(fig, (15, 12))
         
         # Network rate increase percentage
         plt.subplot(4, 1, 1)  # Changed from 3, 1, 1 to 4, 1, 1 to add latency
@@ -107,7 +141,7 @@ def create_ddos_visualizations(summary_df, impact_df, output_dir):
         
         # Recovery analysis (if we have recovery data)
         if 'recovery_cpu_ratio' in impact_df.columns and not all(impact_df['recovery_cpu_ratio'].isna()):
-            plt.figure(figsize=(15, 8))
+            fig = prepare_figure(fig, (15, 8))
             
             # Plot recovery ratios (>1 means not fully recovered)
             
@@ -158,7 +192,7 @@ def create_ddos_visualizations(summary_df, impact_df, output_dir):
     except Exception as e:
         print(f"Error creating DDoS attack visualizations: {e}")
 
-def create_time_series_visualizations(df, output_dir):
+def create_time_series_visualizations(df, output_dir, fig=None):
     """Create time series visualizations for DDoS attacks"""
     if df.empty:
         print("WARNING: Empty dataframe, skipping time series visualizations")
@@ -205,7 +239,7 @@ def create_time_series_visualizations(df, output_dir):
             }
             
             # Resource usage time series
-            plt.figure(figsize=(15, 16))  # Increased height to accommodate 4 subplots
+            fig = prepare_figure(fig, (15, 16))  # Increased height to accommodate 4 subplots
             
             # CPU Usage
             plt.subplot(4, 1, 1)  # Changed from 3, 1, 1 to 4, 1, 1 to add latency
@@ -297,7 +331,7 @@ def create_time_series_visualizations(df, output_dir):
             print(f"Created time series visualization for {fault} fault")
             
             # Also create normalized time series visualization
-            plt.figure(figsize=(15, 16))  # Increased height for 4 subplots
+            fig = prepare_figure(fig, (15, 16))  # Increased height for 4 subplots
             
             # Function to plot normalized phase data
             def plot_normalized_phase(ax, phase_name, column):
@@ -409,7 +443,7 @@ def create_time_series_visualizations(df, output_dir):
         except Exception as e:
             print(f"Error creating time series visualization for {fault} fault: {e}")
 
-def create_latency_visualizations(df, output_dir):
+def create_latency_visualizations(df, output_dir, fig=None):
     """
     Create detailed latency visualizations that clearly distinguish between
     measured and estimated values
@@ -417,6 +451,7 @@ def create_latency_visualizations(df, output_dir):
     Parameters:
     - df: DataFrame with processed latency data
     - output_dir: Directory to save visualization files
+    - fig: Optional Figure to reuse for every plot instead of creating new ones
     """
     import matplotlib.pyplot as plt
     import seaborn as sns
@@ -461,7 +496,7 @@ def create_latency_visualizations(df, output_dir):
             print(f"Saved latency estimation summary to {summary_file}")
             
             # Create visualization of estimation methods
-            plt.figure(figsize=(14, 8))
+            fig = prepare_figure(fig, (14, 8))
             for i, col in enumerate(summary_df["latency_column"].unique()):
                 plt.subplot(1, len(summary_df["latency_column"].unique()), i+1)
                 col_data = summary_df[summary_df["latency_column"] == col]
@@ -485,7 +520,7 @@ def create_latency_visualizations(df, output_dir):
         col_data["datetime"] = pd.to_datetime(col_data["timestamp"], unit='s')
         
         # Create separate visualizations for reliable vs. estimated values
-        plt.figure(figsize=(12, 8))
+        fig = prepare_figure(fig, (12, 8))
         
         # Get unique phases
         phases = col_data["phase"].unique()
@@ -550,7 +585,7 @@ def create_latency_visualizations(df, output_dir):
         print(f"Created latency reliability visualization for {latency_col}")
         
         # Create a combined visualization with both measured and estimated values
-        plt.figure(figsize=(12, 6))
+        fig = prepare_figure(fig, (12, 6))
         
         for phase in phases:
             # Get reliable measurements for this phase
@@ -613,59 +648,174 @@ def create_latency_visualizations(df, output_dir):
                 })
     
     if estimation_by_phase:
-        phase_summary_df = pd.DataFrame(estimation_by_phase)
+        # Point counts are integral; pin the dtype so the "n=" labels format as ints
+        phase_summary_df = pd.DataFrame(estimation_by_phase).astype({"total_points": "int64"})
         summary_file = output_dir / "latency_estimation_by_phase.csv"
         phase_summary_df.to_csv(summary_file, index=False)
         print(f"Saved latency estimation by phase summary to {summary_file}")
         
         # Create visualization
-        plt.figure(figsize=(14, 8))
+        out_path = output_dir / "latency_reliability_by_phase.png"
         
         if len(latency_cols) > 0:
             num_cols = min(3, len(latency_cols))
             num_rows = (len(latency_cols) + num_cols - 1) // num_cols
             
-            for i, col in enumerate(latency_cols):
-                if i < len(latency_cols):
-                    plt.subplot(num_rows, num_cols, i+1)
+            # Grid styling comes from the rc context instead of per-panel calls
+            with plt.rc_context(RELIABILITY_GRID_RC):
+                fig = prepare_figure(fig, (14, 8), layout="constrained")
+                axes = fig.subplots(num_rows, num_cols, squeeze=False, sharey=True)
+            
+                # Shared y-axis: one limit and one label per row cover every panel
+                axes[0, 0].set_ylim(0, 110)  # Make room for the count annotations
+                for ax in axes[:, 0]:
+                    ax.set_ylabel("Percentage")
+            
+                # Hide the unused trailing cells of the grid
+                for ax in axes.flat[len(latency_cols):]:
+                    ax.set_visible(False)
+            
+                for i, col in enumerate(latency_cols):
+                    ax = axes.flat[i]
                     col_data = phase_summary_df[phase_summary_df["latency_column"] == col]
-                    
+                
                     if not col_data.empty:
                         col_data = col_data.sort_values("phase")
-                        
-                        # Plot stacked bar chart
-                        bars = plt.bar(col_data["phase"], col_data["measured_percent"], label="Measured")
-                        plt.bar(col_data["phase"], col_data["estimated_percent"], 
-                                bottom=col_data["measured_percent"], label="Estimated", 
-                                color="orange")
-                        
+                    
+                        # Pull the plotted columns out as plain arrays once
+                        col_arrays = {c: col_data[c].to_numpy() for c in 
+                                      ["phase", "measured_percent", "estimated_percent"]}
+                        col_arrays["total_points"] = col_data["total_points"].to_numpy(dtype=np.int64)
+                    
+                        # Plot stacked bar chart at explicit positions; the bars are
+                        # centred on them, so they double as the annotation x values
+                        xs = np.arange(len(col_arrays["phase"]))
+                        ax.bar(xs, col_arrays["measured_percent"], label="Measured")
+                        ax.bar(xs, col_arrays["estimated_percent"], 
+                               bottom=col_arrays["measured_percent"], label="Estimated", 
+                               color="orange")
+                        ax.set_xticks(xs, labels=col_arrays["phase"])
+                    
                         # Add total point count as text
-                        for i, bar in enumerate(bars):
-                            total_points = col_data.iloc[i]["total_points"]
-                            plt.text(bar.get_x() + bar.get_width()/2, 105, 
+                        for x, total_points in zip(xs, col_arrays["total_points"]):
+                            ax.text(x, 105, 
                                     f"n={total_points}", ha="center", va="bottom", 
                                     fontsize=8)
-                        
-                        plt.title(f"Data Reliability - {col}", fontsize=10)
-                        plt.ylabel("Percentage")
-                        plt.ylim(0, 110)  # Make room for the count annotations
-                        plt.grid(True, alpha=0.3)
-                        
-                        if i == 0:  # Only add legend to the first subplot
-                            plt.legend()
+                    
+                        ax.set_title(f"Data Reliability - {col}", fontsize=10)
             
-            plt.tight_layout()
-            plt.savefig(output_dir / "latency_reliability_by_phase.png")
+                # Every panel uses the same two series, so one figure-level
+                # legend built from the first panel covers them all
+                handles, labels = axes.flat[0].get_legend_handles_labels()
+                if handles:
+                    fig.legend(handles, labels, loc="outside upper center", ncol=len(labels))
+            
+                fig.savefig(out_path)
             print("Created latency reliability by phase visualization")
 
+def time_series_columns(columns):
+    """
+    Select the columns read by create_time_series_visualizations - the labels,
+    the timestamp and the first column of each metric it plots
+    
+    Parameters:
+    - columns: Column names of the combined dataset
+    
+    Returns:
+    - List of the needed column names, in original order
+    """
+    metric_matchers = (
+        lambda col: col.startswith("cpu_"),
+        lambda col: col.startswith("memory_"),
+        lambda col: "true_dev_" in col,
+        lambda col: col.startswith("latency_ms_"),
+        lambda col: "network_sent_rate_" in col,
+        lambda col: col.startswith("reporting_interval_"),
+    )
+    needed = {"timestamp", "phase", "vulnerability_type", "response_time_ms"}
+    needed.update(next((col for col in columns if matches(col)), None) for matches in metric_matchers)
+    return [col for col in columns if col in needed]
+
+def latency_columns(columns):
+    """
+    Select the columns read by create_latency_visualizations - the latency
+    values with their estimation flags and methods, the timestamp and phase
+    
+    Parameters:
+    - columns: Column names of the combined dataset
+    
+    Returns:
+    - List of the needed column names, in original order
+    """
+    return [col for col in columns if col in ("timestamp", "phase") or col.startswith("latency_ms_")]
+
+def print_summary_records(records, max_rows=SUMMARY_MAX_ROWS):
+    """
+    Print a summary table as fixed-width text straight from a NumPy record
+    array, formatting floats to two decimals without building a DataFrame
+    """
+    records = records[:max_rows]
+    names = records.dtype.names
+    floats = [np.issubdtype(records.dtype[name], np.floating) for name in names]
+    
+    # Size every column to its longest formatted value (or its name)
+    widths = []
+    for name, is_float in zip(names, floats):
+        values = np.char.mod("%.2f", records[name]) if is_float else records[name].astype(str)
+        widths.append(max(len(name), int(np.char.str_len(values).max(initial=0))))
+    
+    fmt = [f"%{width}.2f" if is_float else f"%{width}s" for width, is_float in zip(widths, floats)]
+    header = " ".join(name.rjust(width) for name, width in zip(names, widths))
+    np.savetxt(sys.stdout, records, fmt=fmt, header=header, comments="")
+
+def process_scenario(files, fault_type, output_dir):
+    """
+    Process one DDoS fault scenario and save it to CSV. Runs in a worker process.
+    
+    Parameters:
+    - files: Scenario entry from the metadata with baseline/event/recovery files
+    - fault_type: Fault type the scenario was recorded under
+    - output_dir: Directory to save the per-scenario CSV file
+    
+    Returns:
+    - DataFrame for the scenario (empty if no data could be extracted)
+    """
+    # Use standardized process_dataset function. This already runs in a
+    # scenario worker, so the phases are loaded in-process
+    df = process_dataset(
+        files["baseline_file"],
+        files["event_file"],
+        files["recovery_file"],
+        fault_type,
+        parallel=False
+    )
+    
+    if df.empty:
+        return df
+    
+    # Save to CSV
+    csv_file = output_dir / f"ddos_{fault_type}.csv"
+    df.to_csv(csv_file, index=False)
+    logger.info("Saved %s", csv_file)
+    
+    return df
+
 def main():
     parser = argparse.ArgumentParser(description="Process DDoS attack datasets")
     parser.add_argument("--metadata", required=True, help="Master metadata JSON file")
     parser.add_argument("--output", default="analysis/ddos", help="Output directory for analysis")
     parser.add_argument("--debug", action="store_true", help="Enable debug output")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="csv",
+                        help="File format of the summary and impact tables")
     
     args = parser.parse_args()
     
+    # Configure logging - debug records are only formatted when --debug is set
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    logger.setLevel(logging.DEBUG if args.debug else logging.INFO)
+    if args.debug:
+        enable_debug_logging()
+    
     # Create output directory
     output_dir = Path(args.output)
     output_dir.mkdir(exist_ok=True, parents=True)
@@ -673,96 +823,124 @@ def main():
     # Load master metadata
     print(f"Loading metadata from: {args.metadata}")
     try:
-        with open(args.metadata, 'r') as f:
-            metadata = json.load(f)
+        if orjson is not None:
+            metadata = orjson.loads(Path(args.metadata).read_bytes())
+        else:
+            with open(args.metadata, 'rb') as f:
+                metadata = json.load(f)
     except Exception as e:
         print(f"Error loading metadata file: {e}")
         return
     
-    if args.debug:
-        print(f"Metadata structure: {json.dumps(metadata, indent=2)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        if orjson is not None:
+            logger.debug("Metadata structure: %s", orjson.dumps(metadata, option=orjson.OPT_INDENT_2).decode())
+        else:
+            logger.debug("Metadata structure: %s", json.dumps(metadata, indent=2))
     
-    # Process each fault scenario
-    all_dfs = []
+    # Collect the fault scenarios that have all required files
+    required_files = ["baseline_file", "event_file", "recovery_file"]
+    scenarios = {}
     for fault_type, files in metadata.get("fault_scenarios", {}).items():
-        print(f"\nProcessing {fault_type} fault scenario...")
-        
-        # Check if we have all required files
-        required_files = ["baseline_file", "event_file", "recovery_file"]
         if not all(key in files for key in required_files):
-            print(f"WARNING: Missing required files for {fault_type} scenario. Skipping.")
-            continue
-        
-        # Use standardized process_dataset function
-        df = process_dataset(
-            files["baseline_file"],
-            files["event_file"],
-            files["recovery_file"],
-            fault_type
-        )
-        
-        if df.empty:
-            print(f"WARNING: No data for {fault_type} scenario. Skipping.")
+            logger.warning("WARNING: Missing required files for %s scenario. Skipping.", fault_type)
             continue
-            
-        # Ensure phase names are standardized (convert "attack" to "event")
-        if "attack" in df["phase"].unique():
-            df.loc[df["phase"] == "attack", "phase"] = "event"
-            
-        all_dfs.append(df)
-        
-        # Save to CSV
-        csv_file = output_dir / f"ddos_{fault_type}.csv"
-        df.to_csv(csv_file, index=False)
-        print(f"Saved {csv_file}")
+        scenarios[fault_type] = files
+    
+    # Process and save each fault scenario in its own worker process - the
+    # scenarios read independent files, so this is embarrassingly parallel
+    all_dfs = []
+    if scenarios:
+        max_workers = max(1, min(len(scenarios), os.cpu_count() or 1))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for fault_type, files in scenarios.items():
+                logger.info("\nProcessing %s fault scenario...", fault_type)
+                futures[fault_type] = executor.submit(process_scenario, files, fault_type, output_dir)
+            
+            # Collect in submission order so the combined dataset stays deterministic
+            for fault_type, future in futures.items():
+                df = future.result()
+                
+                if df.empty:
+                    logger.warning("WARNING: No data for %s scenario. Skipping.", fault_type)
+                    continue
+                    
+                all_dfs.append(df)
+    
+    if not all_dfs:
+        print("WARNING: No valid data for any fault scenario. Check input files and Prometheus data format.")
+        return
     
     # Combine all scenarios
-    if all_dfs:
-        all_data = pd.concat(all_dfs)
-        
-        # Standardize column names
-        if "fault_type" in all_data.columns and "vulnerability_type" not in all_data.columns:
-            all_data.rename(columns={"fault_type": "vulnerability_type"}, inplace=True)
-            
-        master_csv = output_dir / "all_ddos_scenarios.csv"
-        all_data.to_csv(master_csv, index=False)
-        print(f"Saved combined dataset to {master_csv}")
-        
-        # Analyze DDoS impact using standardized function
-        print("Analyzing DDoS attack impact...")
-        summary_df, impact_df = analyze_impact(all_data, output_dir, "ddos")
-        
-        # Create DDoS-specific visualizations
-        create_ddos_visualizations(summary_df, impact_df, output_dir)
-        
-        # Create time series visualizations
-        print("Creating time series visualizations...")
-        create_time_series_visualizations(all_data, output_dir)
+    all_data = pd.concat(all_dfs, ignore_index=True, sort=False)
 
-        print("Creating latency visualizations...")
-        create_latency_visualizations(all_data, output_dir)
-        
-        print(f"Analysis complete. Results saved to {output_dir}")
-        
-        # Print summary statistics for quick reference
-        if not summary_df.empty:
-            print("\n========== DDoS Attack Summary ==========")
-            
-            # Print impact metrics
-            if not impact_df.empty:
-                print("\nImpact by Fault Type:")
-                impact_summary = impact_df[['fault_type', 'network_rate_increase_percent', 'latency_increase_percent', 'reporting_interval_change_percent']]
-                impact_summary = impact_summary.round(2)
-                print(impact_summary.to_string(index=False))
-            
-            print("\nDetailed Metrics by Phase and Fault Type:")
-            metrics_to_show = ['fault_type', 'phase', 'avg_cpu', 'network_egress_rate', 'avg_latency_ms', 'avg_reporting_interval']
-            # Only include columns that exist
-            available_metrics = [col for col in metrics_to_show if col in summary_df.columns]
-            print(summary_df[available_metrics].round(2).to_string(index=False))
-            print("===========================================")
-    else:
-        print("WARNING: No valid data for any fault scenario. Check input files and Prometheus data format.")
+    # Re-lay the float columns as one column-major block per dtype so the
+    # per-column reductions in the analysis step walk contiguous memory.
+    # Each dtype gets its own block - a single to_numpy() over all of them
+    # would upcast the float32 gauge columns back to float64
+    float_dtypes = all_data.dtypes[all_data.dtypes.map(pd.api.types.is_float_dtype)]
+    if len(float_dtypes) > 0:
+        float_blocks = [
+            pd.DataFrame(np.asfortranarray(all_data[cols].to_numpy(dtype=dtype)),
+                         columns=cols, index=all_data.index)
+            for dtype, cols in float_dtypes.index.groupby(float_dtypes).items()
+        ]
+        all_data = pd.concat([all_data.drop(columns=float_dtypes.index), *float_blocks],
+                             axis=1)[all_data.columns]
+
+    # Standardize column names
+    if "fault_type" in all_data.columns and "vulnerability_type" not in all_data.columns:
+        all_data.rename(columns={"fault_type": "vulnerability_type"}, inplace=True)
+    
+    # Keep the low-cardinality label columns categorical for the per-phase
+    # and per-fault filtering done during analysis
+    for col in ["phase", "vulnerability_type"]:
+        if col in all_data.columns:
+            all_data[col] = all_data[col].astype("category")
+        
+    master_csv = output_dir / "all_ddos_scenarios.csv"
+    all_data.to_csv(master_csv, index=False)
+    print(f"Saved combined dataset to {master_csv}")
+    
+    # Analyze DDoS impact using standardized function
+    print("Analyzing DDoS attack impact...")
+    summary_df, impact_df = analyze_impact(all_data, output_dir, "ddos", args.output_format)
+    
+    # The three visualization passes only read their inputs, so render them
+    # concurrently; each worker reuses a single figure of its own and is
+    # sent only the columns it draws
+    print("Creating DDoS, time series and latency visualizations...")
+    plot_jobs = [
+        (create_ddos_visualizations, summary_df, impact_df, output_dir),
+        (create_time_series_visualizations, all_data[time_series_columns(all_data.columns)], output_dir),
+        (create_latency_visualizations, all_data[latency_columns(all_data.columns)], output_dir),
+    ]
+    max_workers = max(1, min(len(plot_jobs), os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(*job) for job in plot_jobs]
+        for future in futures:
+            future.result()
+    
+    print(f"Analysis complete. Results saved to {output_dir}")
+    
+    # Print summary statistics for quick reference
+    if not summary_df.empty:
+        print("\n========== DDoS Attack Summary ==========")
+        
+        # Print impact metrics
+        if not impact_df.empty:
+            print("\nImpact by Fault Type:")
+            impact_cols = ['fault_type', 'network_rate_increase_percent', 'latency_increase_percent', 'reporting_interval_change_percent']
+            impact_idx = [impact_df.columns.get_loc(col) for col in impact_cols]
+            print_summary_records(impact_df.iloc[:, impact_idx].to_records(index=False))
+        
+        print("\nDetailed Metrics by Phase and Fault Type:")
+        metrics_to_show = ['fault_type', 'phase', 'avg_cpu', 'network_egress_rate', 'avg_latency_ms', 'avg_reporting_interval']
+        # Only include columns that exist
+        available_metrics_idx = [summary_df.columns.get_loc(col) for col in metrics_to_show if col in summary_df.columns]
+        print_summary_records(summary_df.iloc[:, available_metrics_idx].to_records(index=False))
+        print("===========================================")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -6,47 +6,138 @@ import pandas as pd
 import numpy as np
 import argparse
 import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+import matplotlib
+matplotlib.use("Agg")  # Files only - no GUI backend setup
 import matplotlib.pyplot as plt
-import seaborn as sns
 import matplotlib.dates as mdates
 
+# Polars is optional - fall back to pandas for the fault summary when it is missing
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# Numba is optional - reduce_by_group falls back to numpy reduceat when it is missing
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
 # Import standardized utilities
 from shared_metrics_utils import (
-    load_jsonl, 
-    extract_metrics,
+    iter_jsonl,
+    append_row,
+    extract_snapshot_metrics,
+    format_human_time,
     calculate_derived_metrics,
-    standardize_processor_output
+    downcast_gauge_metrics,
+    standardize_processor_output,
+    write_csv
 )
 
+# Column groups used by the analysis and visualization functions
+ColumnSets = namedtuple("ColumnSets", [
+    "temperature", "gateway_temp", "true_temp", "true_dev",
+    "zscore", "interval", "latency", "method"
+])
+
+@lru_cache(maxsize=8)
+def classify_columns(columns):
+    """
+    Classify column names into the metric groups used across this module.
+    Cached on the tuple of column names, so each layout is only scanned once.
+    
+    Parameters:
+    - columns: Tuple of DataFrame column names
+    
+    Returns:
+    - ColumnSets of tuples, each in original column order
+    """
+    return ColumnSets(
+        temperature=tuple(col for col in columns if col.startswith("temperature_")),
+        gateway_temp=tuple(col for col in columns if col.startswith("gateway_temp_")),
+        true_temp=tuple(col for col in columns if col.startswith("true_temp_")),
+        true_dev=tuple(col for col in columns if "true_dev_" in col),
+        zscore=tuple(col for col in columns if "_zscore" in col),
+        interval=tuple(col for col in columns if col.startswith("reporting_interval_")),
+        latency=tuple(col for col in columns if col.startswith("latency_ms_") and
+                      not col.endswith("_estimated") and not col.endswith("_method")),
+        method=tuple(col for col in columns if col.endswith("_method"))
+    )
+
+def analysis_columns(columns):
+    """
+    Select the columns read by the fault analysis and visualization functions
+    
+    Parameters:
+    - columns: Column names of the combined dataset
+    
+    Returns:
+    - List of the needed column names, in original order
+    """
+    column_sets = classify_columns(tuple(columns))
+    needed = {"timestamp", "phase", "vulnerability_type"}
+    needed.update(column_sets.temperature, column_sets.gateway_temp, column_sets.true_temp,
+                  column_sets.true_dev, column_sets.zscore, column_sets.interval,
+                  column_sets.latency, column_sets.method)
+    needed.update(f"{col}_estimated" for col in column_sets.latency)
+    return [col for col in columns if col in needed]
+
+def categorical_columns(columns):
+    """Low-cardinality label columns that are stored as categoricals"""
+    return [col for col in columns if col in ("vulnerability_type", "phase") or col.endswith("_method")]
+
 def process_fault_dataset(file_path, fault_type):
     """
     Process a fault dataset file - custom for fault datasets since they
     don't follow the baseline/event/recovery pattern
     """
-    # Load the data
-    print(f"Loading data for {fault_type} fault from: {file_path}")
-    data = load_jsonl(file_path)
+    # Stream the file and extract each snapshot straight into per-column lists,
+    # instead of holding every raw record plus a list of row dicts in memory.
+    # Using "active" as the phase since fault datasets don't have explicit phases
+    print(f"Loading and extracting metrics for {fault_type} fault from: {file_path}")
+    columns = {}
+    num_records = 0
+    num_rows = 0
+    for snapshot in iter_jsonl(file_path):
+        num_records += 1
+        if snapshot.get("data_type") != "metrics":
+            continue
+        
+        metric_data = extract_snapshot_metrics(snapshot, "active", fault_type)
+        if metric_data is None:
+            continue
+        
+        append_row(columns, metric_data, num_rows)
+        num_rows += 1
     
-    if not data:
+    if num_records == 0:
         print(f"WARNING: No data loaded from {file_path}")
         return pd.DataFrame()
     
-    # Extract metrics - using "active" as the phase since fault datasets don't have explicit phases
-    print(f"Extracting metrics for {fault_type} fault...")
-    metrics = extract_metrics(data, "active", fault_type)
-    
-    if not metrics:
+    if num_rows == 0:
         print(f"WARNING: No metrics extracted for {fault_type} fault")
         return pd.DataFrame()
     
-    # Create DataFrame
-    df = pd.DataFrame(metrics)
+    print(f"Extracted {num_rows} valid metric snapshots for {fault_type} fault")
+    
+    # Create DataFrame directly from the columns
+    columns["human_time"] = format_human_time(columns["timestamp"])
+    df = pd.DataFrame(columns)
     
     # Calculate derived metrics
     print(f"Calculating derived metrics for {fault_type} fault...")
     df = calculate_derived_metrics(df)
     
+    # Raw and derived gauge metrics (deviations, z-scores, intervals, latencies)
+    # as float32 - halves the memory the aggregation passes stream through.
+    # Timestamps, counters and the rates derived from them stay float64
+    df = downcast_gauge_metrics(df)
+    
     # Standardize column names
     df = standardize_processor_output(df)
     
@@ -54,131 +145,208 @@ def process_fault_dataset(file_path, fault_type):
     if "fault_type" in df.columns and "vulnerability_type" not in df.columns:
         df.rename(columns={"fault_type": "vulnerability_type"}, inplace=True)
     
+    # Low-cardinality labels as categoricals - groupby and masks then work on integer codes
+    for col in categorical_columns(df.columns):
+        df[col] = df[col].astype("category")
+    
     return df
 
+def summarize_faults_polars(df, sensor_temp_cols, true_dev_cols, zscore_cols, interval_cols, latency_cols):
+    """
+    Compute the per-fault summary statistics with a single Polars group_by
+    
+    Parameters:
+    - df: DataFrame with all fault scenarios, its metric columns already numeric
+    - sensor_temp_cols, true_dev_cols, zscore_cols, interval_cols, latency_cols: Metric columns to summarize
+    
+    Returns:
+    - Summary DataFrame with one row per fault type
+    """
+    value_cols = list(dict.fromkeys(sensor_temp_cols + true_dev_cols + zscore_cols + interval_cols + latency_cols))
+    
+    # Build from plain numpy columns (no pyarrow needed); NaN becomes null so it is skipped like in pandas
+    pldf = pl.DataFrame(
+        {
+            "vulnerability_type": df["vulnerability_type"].to_numpy(dtype=object).astype(str),
+            **{col: df[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in value_cols}
+        },
+        nan_to_null=True
+    )
+    
+    aggs = [pl.len().alias("measurements")]
+    aggs += [pl.col(col).mean().alias(f"{col}__mean") for col in sensor_temp_cols]
+    aggs += [pl.col(col).std().alias(f"{col}__std") for col in sensor_temp_cols]
+    aggs += [pl.col(col).mean().alias(f"{col}__mean") for col in true_dev_cols + zscore_cols + latency_cols
+             if col not in sensor_temp_cols]
+    aggs += [pl.col(col).max().alias(f"{col}__max") for col in true_dev_cols + zscore_cols]
+    # Filter out outliers and initialization values - ignore gaps > 30 seconds
+    aggs += [pl.col(col).filter((pl.col(col) > 0) & (pl.col(col) < 30)).mean().alias(f"{col}__interval")
+             for col in interval_cols]
+    
+    grouped = pldf.group_by("vulnerability_type", maintain_order=True).agg(aggs)
+    
+    def across(reducer, cols, suffix):
+        # Reduce the per-sensor aggregates horizontally, null if there are no such columns
+        if not cols:
+            return pl.lit(None, dtype=pl.Float64)
+        return reducer([f"{col}__{suffix}" for col in cols])
+    
+    summary = grouped.select(
+        pl.col("vulnerability_type").alias("fault_type"),
+        across(pl.mean_horizontal, sensor_temp_cols, "mean").alias("avg_temp"),
+        across(pl.mean_horizontal, sensor_temp_cols, "std").alias("temp_std"),
+        across(pl.mean_horizontal, true_dev_cols, "mean").alias("avg_deviation"),
+        across(pl.max_horizontal, true_dev_cols, "max").alias("max_deviation"),
+        across(pl.mean_horizontal, zscore_cols, "mean").alias("avg_zscore"),
+        across(pl.max_horizontal, zscore_cols, "max").alias("max_zscore"),
+        across(pl.mean_horizontal, interval_cols, "interval").alias("avg_reporting_interval"),
+        across(pl.mean_horizontal, latency_cols, "mean").alias("avg_latency_ms"),
+        pl.col("measurements")
+    )
+    
+    return pd.DataFrame(summary.to_dict(as_series=False)).astype({
+        col: "float64" for col in summary.columns if col not in ("fault_type", "measurements")
+    })
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def reduce_by_group_kernel(block, starts, ends, out_mean, out_std, out_max):
+        """Fused per-group mean/std/max over a row-sorted block (one Welford sweep per group)"""
+        for g in prange(starts.shape[0]):
+            for c in range(block.shape[1]):
+                count = 0
+                mean = 0.0
+                m2 = 0.0
+                maximum = np.nan
+                for r in range(starts[g], ends[g]):
+                    x = block[r, c]
+                    if np.isnan(x):
+                        continue
+                    count += 1
+                    delta = x - mean
+                    mean += delta / count
+                    m2 += delta * (x - mean)
+                    if count == 1 or x > maximum:
+                        maximum = x
+                out_mean[g, c] = mean if count > 0 else np.nan
+                out_std[g, c] = np.sqrt(m2 / (count - 1)) if count > 1 else np.nan
+                out_max[g, c] = maximum
+
+def reduce_by_group(block, starts):
+    """
+    Per-group mean, sample standard deviation and maximum of every column of a
+    2-D block whose rows are sorted by group. NaN values are skipped like in pandas.
+    
+    Parameters:
+    - block: 2-D float64 array with rows sorted by group
+    - starts: Row index where each group begins
+    
+    Returns:
+    - Tuple of (mean, std, max) arrays with shape (n_groups, n_columns)
+    """
+    shape = (len(starts), block.shape[1])
+    if block.shape[0] == 0 or block.shape[1] == 0:
+        return np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+    
+    if njit is not None:
+        mean, std, maximum = np.empty(shape), np.empty(shape), np.empty(shape)
+        ends = np.append(starts[1:], block.shape[0]).astype(np.int64)
+        reduce_by_group_kernel(np.ascontiguousarray(block), starts.astype(np.int64), ends,
+                               mean, std, maximum)
+        return mean, std, maximum
+    
+    valid = ~np.isnan(block)
+    counts = np.add.reduceat(valid, starts, axis=0)
+    sums = np.add.reduceat(np.where(valid, block, 0.0), starts, axis=0)
+    mean = np.full(shape, np.nan)
+    np.divide(sums, counts, out=mean, where=counts > 0)
+    
+    # Second pass over the deviations from the group mean keeps the variance stable
+    sizes = np.diff(np.append(starts, block.shape[0]))
+    residuals = np.where(valid, block - np.repeat(mean, sizes, axis=0), 0.0)
+    squares = np.add.reduceat(residuals * residuals, starts, axis=0)
+    std = np.full(shape, np.nan)
+    np.divide(squares, counts - 1, out=std, where=counts > 1)
+    np.sqrt(std, out=std)
+    
+    # fmax ignores NaN unless the whole group is NaN
+    maximum = np.fmax.reduceat(block, starts, axis=0)
+    return mean, std, maximum
+
 def analyze_fault_characteristics(df, output_dir):
     """Analyze key characteristics of each fault type"""
     if df.empty:
         print("WARNING: Empty dataframe, skipping fault characteristics analysis")
         return pd.DataFrame()
     
-    import pandas as pd
-    import numpy as np
-    from pathlib import Path
-    import matplotlib.pyplot as plt
-    import seaborn as sns
-        
+    column_sets = classify_columns(tuple(df.columns))
+    
     # First, ensure that all columns ending with _method are properly handled as strings
-    # and all latency columns are numeric
-    for col in df.columns:
-        if col.endswith("_method"):
-            df[col] = df[col].astype(str)
-        elif col.startswith("latency_ms_") and not col.endswith("_estimated") and not col.endswith("_method"):
-            # Ensure all latency values are numeric
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+    # and all metric columns are numeric - typed once here, converting only the
+    # columns that are not numeric already, so the summaries below read them as is
+    for col in column_sets.method:
+        df[col] = df[col].astype(str).astype("category")
+    metric_cols = (column_sets.temperature + column_sets.true_dev + column_sets.zscore +
+                   column_sets.interval + column_sets.latency)
+    non_numeric_cols = [col for col in dict.fromkeys(metric_cols)
+                        if not pd.api.types.is_numeric_dtype(df[col])]
+    if non_numeric_cols:
+        df[non_numeric_cols] = df[non_numeric_cols].apply(pd.to_numeric, errors='coerce')
         
-    fault_types = df["vulnerability_type"].unique()
-    
     # Find temperature columns
-    sensor_temp_cols = [col for col in df.columns if col.startswith("temperature_")]
-    deviation_cols = [col for col in df.columns if "dev_" in col]
-    zscore_cols = [col for col in df.columns if "_zscore" in col]
-    interval_cols = [col for col in df.columns if col.startswith("reporting_interval_")]
-    latency_cols = [col for col in df.columns if col.startswith("latency_ms_") and 
-                     not col.endswith("_estimated") and not col.endswith("_method")]
-    
-    # Prepare summary statistics
-    summary = {
-        "fault_type": [],
-        "avg_temp": [],
-        "temp_std": [],
-        "avg_deviation": [],
-        "max_deviation": [],
-        "avg_zscore": [],
-        "max_zscore": [],
-        "avg_reporting_interval": [],
-        "avg_latency_ms": [],
-        "measurements": []
-    }
-    
-    # Generate summary statistics for each fault type
-    for fault in fault_types:
-        fault_df = df[df["vulnerability_type"] == fault]
-        
-        # Get average temperature across all sensors
-        avg_temps = []
-        for col in sensor_temp_cols:
-            if col in fault_df.columns:
-                avg_temps.append(fault_df[col].mean())
-        
-        # Get average standard deviation across all sensors
-        std_temps = []
-        for col in sensor_temp_cols:
-            if col in fault_df.columns:
-                std_temps.append(fault_df[col].std())
-        
-        # Get average deviation from true values
-        avg_devs = []
-        for col in deviation_cols:
-            if "true_dev_" in col and col in fault_df.columns:
-                avg_devs.append(fault_df[col].mean())
-        
-        # Get maximum deviation from true values
-        max_devs = []
-        for col in deviation_cols:
-            if "true_dev_" in col and col in fault_df.columns:
-                max_devs.append(fault_df[col].max())
-                
-        # Get average z-scores (anomaly indicators)
-        avg_zscores = []
-        for col in zscore_cols:
-            if col in fault_df.columns:
-                avg_zscores.append(fault_df[col].mean())
-        
-        # Get maximum z-scores
-        max_zscores = []
-        for col in zscore_cols:
-            if col in fault_df.columns:
-                max_zscores.append(fault_df[col].max())
-                
-        # Get average reporting intervals
-        avg_intervals = []
-        for col in interval_cols:
-            if col in fault_df.columns:
-                # Filter out outliers and initialization values
-                valid_intervals = fault_df[col].dropna()
-                valid_intervals = pd.to_numeric(valid_intervals, errors='coerce')
-                valid_intervals = valid_intervals[valid_intervals > 0]
-                valid_intervals = valid_intervals[valid_intervals < 30]  # Ignore gaps > 30 seconds
-                if not valid_intervals.empty:
-                    avg_intervals.append(valid_intervals.mean())
-                    
-        # Get average latency
-        avg_latencies = []
-        for col in latency_cols:
-            if col in fault_df.columns:
-                # Make sure values are numeric before calculating mean
-                numeric_values = pd.to_numeric(fault_df[col], errors='coerce')
-                avg_latencies.append(numeric_values.mean())
-        
-        # Add to summary
-        summary["fault_type"].append(fault)
-        summary["avg_temp"].append(np.mean(avg_temps) if avg_temps else np.nan)
-        summary["temp_std"].append(np.mean(std_temps) if std_temps else np.nan)
-        summary["avg_deviation"].append(np.mean(avg_devs) if avg_devs else np.nan)
-        summary["max_deviation"].append(np.max(max_devs) if max_devs else np.nan)
-        summary["avg_zscore"].append(np.mean(avg_zscores) if avg_zscores else np.nan)
-        summary["max_zscore"].append(np.max(max_zscores) if max_zscores else np.nan)
-        summary["avg_reporting_interval"].append(np.mean(avg_intervals) if avg_intervals else np.nan)
-        summary["avg_latency_ms"].append(np.nanmean(avg_latencies) if avg_latencies else np.nan)
-        summary["measurements"].append(len(fault_df))
-    
-    # Create summary DataFrame
-    summary_df = pd.DataFrame(summary)
+    sensor_temp_cols = list(column_sets.temperature)
+    true_dev_cols = list(column_sets.true_dev)
+    zscore_cols = list(column_sets.zscore)
+    interval_cols = list(column_sets.interval)
+    latency_cols = list(column_sets.latency)
+    
+    if pl is not None:
+        # One group_by over all metric columns instead of a filtered copy per fault type
+        summary_df = summarize_faults_polars(df, sensor_temp_cols, true_dev_cols, zscore_cols,
+                                             interval_cols, latency_cols)
+    else:
+        # Factorize the fault types once and sort the rows by fault code, so every
+        # metric block below is reduced per fault with reduceat in one numpy pass
+        codes, uniques = pd.factorize(df["vulnerability_type"])
+        order = np.argsort(codes, kind="stable")
+        order = order[codes[order] >= 0]
+        starts = np.searchsorted(codes[order], np.arange(len(uniques)))
+        
+        def metric_block(cols):
+            return df[cols].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+        
+        def across(stats, how):
+            # Reduce the per-sensor aggregates horizontally, skipping sensors without data
+            if stats.shape[1] == 0:
+                return np.nan
+            return pd.DataFrame(stats, index=uniques).agg(how, axis=1)
+        
+        temp_mean, temp_std, _ = reduce_by_group(metric_block(sensor_temp_cols), starts)
+        dev_mean, _, dev_max = reduce_by_group(metric_block(true_dev_cols), starts)
+        zscore_mean, _, zscore_max = reduce_by_group(metric_block(zscore_cols), starts)
+        latency_mean, _, _ = reduce_by_group(metric_block(latency_cols), starts)
+        
+        # Filter out outliers and initialization values - ignore gaps > 30 seconds
+        intervals = metric_block(interval_cols)
+        intervals[~((intervals > 0) & (intervals < 30))] = np.nan
+        interval_mean, _, _ = reduce_by_group(intervals, starts)
+        
+        summary_df = pd.DataFrame({
+            "fault_type": uniques,
+            "avg_temp": across(temp_mean, "mean"),
+            "temp_std": across(temp_std, "mean"),
+            "avg_deviation": across(dev_mean, "mean"),
+            "max_deviation": across(dev_max, "max"),
+            "avg_zscore": across(zscore_mean, "mean"),
+            "max_zscore": across(zscore_max, "max"),
+            "avg_reporting_interval": across(interval_mean, "mean"),
+            "avg_latency_ms": across(latency_mean, "mean"),
+            "measurements": np.diff(np.append(starts, len(order)))
+        }, index=uniques).reset_index(drop=True)
     
     # Save summary to CSV
     summary_file = output_dir / "fault_characteristics_summary.csv"
-    summary_df.to_csv(summary_file, index=False)
+    write_csv(summary_df, summary_file)
     print(f"Saved fault characteristics summary to {summary_file}")
     
     # Create bar chart for key metrics
@@ -187,28 +355,28 @@ def analyze_fault_characteristics(df, output_dir):
         
         # Plot average deviation by fault type
         plt.subplot(3, 2, 1)
-        sns.barplot(x="fault_type", y="avg_deviation", data=summary_df)
+        plt.bar(summary_df["fault_type"].astype(str), summary_df["avg_deviation"])
         plt.title("Average Temperature Deviation by Fault Type")
         plt.ylabel("Deviation (°C)")
         plt.xticks(rotation=45)
         
         # Plot maximum deviation by fault type
         plt.subplot(3, 2, 2)
-        sns.barplot(x="fault_type", y="max_deviation", data=summary_df)
+        plt.bar(summary_df["fault_type"].astype(str), summary_df["max_deviation"])
         plt.title("Maximum Temperature Deviation by Fault Type")
         plt.ylabel("Deviation (°C)")
         plt.xticks(rotation=45)
         
         # Plot average z-score by fault type
         plt.subplot(3, 2, 3)
-        sns.barplot(x="fault_type", y="avg_zscore", data=summary_df)
+        plt.bar(summary_df["fault_type"].astype(str), summary_df["avg_zscore"])
         plt.title("Average Z-Score by Fault Type")
         plt.ylabel("Z-Score")
         plt.xticks(rotation=45)
         
         # Plot temperature standard deviation by fault type
         plt.subplot(3, 2, 4)
-        sns.barplot(x="fault_type", y="temp_std", data=summary_df)
+        plt.bar(summary_df["fault_type"].astype(str), summary_df["temp_std"])
         plt.title("Temperature Variability by Fault Type")
         plt.ylabel("Standard Deviation (°C)")
         plt.xticks(rotation=45)
@@ -217,7 +385,7 @@ def analyze_fault_characteristics(df, output_dir):
         plt.subplot(3, 2, 5)
         valid_data = summary_df[~summary_df['avg_reporting_interval'].isna()]
         if not valid_data.empty:
-            sns.barplot(x="fault_type", y="avg_reporting_interval", data=valid_data)
+            plt.bar(valid_data["fault_type"].astype(str), valid_data["avg_reporting_interval"])
             plt.title("Average Reporting Interval by Fault Type")
             plt.ylabel("Interval (seconds)")
             plt.xticks(rotation=45)
@@ -226,7 +394,7 @@ def analyze_fault_characteristics(df, output_dir):
         plt.subplot(3, 2, 6)
         valid_data = summary_df[~summary_df['avg_latency_ms'].isna()]
         if not valid_data.empty:
-            sns.barplot(x="fault_type", y="avg_latency_ms", data=valid_data)
+            plt.bar(valid_data["fault_type"].astype(str), valid_data["avg_latency_ms"])
             plt.title("Average Response Latency by Fault Type")
             plt.ylabel("Latency (ms)")
             plt.xticks(rotation=45)
@@ -239,171 +407,290 @@ def analyze_fault_characteristics(df, output_dir):
     
     return summary_df
 
+# Upper bound on the samples drawn per trace - more is invisible at figure resolution
+MAX_PLOT_POINTS = 2000
+
+def decimate(x, y, max_points=MAX_PLOT_POINTS):
+    """
+    Stride-downsample a trace to at most max_points evenly spaced samples,
+    always keeping the first and last one
+    
+    Parameters:
+    - x, y: Series or numpy arrays with the x and y values of the trace
+    - max_points: Maximum number of samples to keep
+    
+    Returns:
+    - Tuple of the (possibly) downsampled x and y
+    """
+    if len(x) <= max_points:
+        return x, y
+    idx = np.linspace(0, len(x) - 1, max_points).astype(np.int64)
+    # take() is positional for both Series and numpy arrays
+    return x.take(idx), y.take(idx)
+
+def render_fault_time_series(fault, fault_df, temp_col, gateway_col, true_col, latency_col,
+                             deviation_col, output_dir):
+    """
+    Render the time series PNG for a single fault type. Top-level so it can run
+    in a worker process.
+    
+    Parameters:
+    - fault: Fault type name
+    - fault_df: Rows of this fault type with the plotted columns and a "datetime" column
+    - temp_col, gateway_col, true_col, latency_col, deviation_col: Columns to plot (None if missing)
+    - output_dir: Directory to save the visualization
+    """
+    fig = plt.figure(figsize=(15, 10))
+    try:
+        ax_temp, ax_metrics = fig.subplots(2, 1)
+        
+        fault_datetime = fault_df["datetime"]
+        
+        # Plot temperature comparison - sensor temperature
+        ax_temp.plot(*decimate(fault_datetime, fault_df[temp_col]), label="Sensor", linewidth=2)
+        
+        # Plot gateway temperature if available
+        if gateway_col:
+            ax_temp.plot(*decimate(fault_datetime, fault_df[gateway_col]), label="Gateway", linewidth=2, linestyle="--")
+        
+        # Plot true temperature if available
+        if true_col:
+            ax_temp.plot(*decimate(fault_datetime, fault_df[true_col]), label="Ground Truth", linewidth=2, linestyle="-.")
+        
+        ax_temp.set_title(f"Temperature Readings During {fault.capitalize()} Fault")
+        ax_temp.set_ylabel("Temperature (°C)")
+        ax_temp.legend()
+        ax_temp.grid(True, alpha=0.3)
+        
+        # Plot related metrics in second subplot
+        handles = []
+        if deviation_col:
+            handles += ax_metrics.plot(*decimate(fault_datetime, fault_df[deviation_col]), 
+                                       label="Temperature Deviation", color="red", linewidth=2)
+            ax_metrics.set_ylabel("Deviation (°C)")
+        
+        # Add latency if available
+        if latency_col:
+            ax2 = ax_metrics.twinx()  # Create second y-axis
+            handles += ax2.plot(*decimate(fault_datetime, fault_df[latency_col]),  # Already in ms
+                                label="Response Latency", color="purple", linestyle=":", linewidth=2)
+            ax2.set_ylabel("Latency (ms)", color="purple")
+            ax2.tick_params(axis='y', colors="purple")
+        
+        ax_metrics.set_title(f"Performance Metrics During {fault.capitalize()} Fault")
+        ax_metrics.set_xlabel("Time")
+        ax_metrics.grid(True, alpha=0.3)
+        if handles:
+            ax_metrics.legend(handles=handles)
+        
+        fig.tight_layout()
+        fig.savefig(output_dir / f"time_series_{fault}.png")
+        print(f"Created time series visualization for {fault} fault")
+    except Exception as e:
+        print(f"Error creating time series visualization for {fault} fault: {e}")
+    finally:
+        plt.close(fig)
+
 def create_time_series_visualizations(df, output_dir):
     """Create time series visualizations for each fault type"""
     if df.empty:
         print("WARNING: Empty dataframe, skipping time series visualizations")
         return
         
-    fault_types = df["vulnerability_type"].unique()
-    
     # Find relevant columns for visualization
-    temp_cols = [col for col in df.columns if col.startswith("temperature_")]
-    if not temp_cols:
+    column_sets = classify_columns(tuple(df.columns))
+    if not column_sets.temperature:
         print("No temperature columns found for time series visualization")
         return
         
-    temp_col = temp_cols[0]  # Use the first temperature column
-    
-    gateway_cols = [col for col in df.columns if col.startswith("gateway_temp_")]
-    gateway_col = gateway_cols[0] if gateway_cols else None
-    
-    true_cols = [col for col in df.columns if col.startswith("true_temp_")]
-    true_col = true_cols[0] if true_cols else None
-    
-    latency_cols = [col for col in df.columns if col.startswith("latency_ms_")]
-    latency_col = latency_cols[0] if latency_cols else None
-    
-    # Create time series plot for each fault type
-    for fault in fault_types:
-        fault_df = df[df["vulnerability_type"] == fault].copy()
-        
-        if fault_df.empty:
-            print(f"WARNING: No data for {fault} fault, skipping visualization")
-            continue
-        
-        try:
-            # Convert timestamp to datetime for better x-axis
-            fault_df["datetime"] = pd.to_datetime(fault_df["timestamp"], unit='s')
-            
-            plt.figure(figsize=(15, 10))
-            
-            # Plot temperature comparison
-            plt.subplot(2, 1, 1)
-            
-            # Plot sensor temperature
-            plt.plot(fault_df["datetime"], fault_df[temp_col], label="Sensor", linewidth=2)
-            
-            # Plot gateway temperature if available
-            if gateway_col and gateway_col in fault_df.columns:
-                plt.plot(fault_df["datetime"], fault_df[gateway_col], label="Gateway", linewidth=2, linestyle="--")
-            
-            # Plot true temperature if available
-            if true_col and true_col in fault_df.columns:
-                plt.plot(fault_df["datetime"], fault_df[true_col], label="Ground Truth", linewidth=2, linestyle="-.")
-            
-            plt.title(f"Temperature Readings During {fault.capitalize()} Fault")
-            plt.ylabel("Temperature (°C)")
-            plt.legend()
-            plt.grid(True, alpha=0.3)
-            
-            # Plot related metrics in second subplot
-            plt.subplot(2, 1, 2)
-            
-            # Find deviation column if it exists
-            deviation_col = None
-            for col in df.columns:
-                if "true_dev_" in col and col in fault_df.columns:
-                    deviation_col = col
-                    break
-            
-            if deviation_col:
-                plt.plot(fault_df["datetime"], fault_df[deviation_col], 
-                         label="Temperature Deviation", color="red", linewidth=2)
-                plt.ylabel("Deviation (°C)")
-            
-            # Add latency if available
-            if latency_col and latency_col in fault_df.columns:
-                ax2 = plt.twinx()  # Create second y-axis
-                ax2.plot(fault_df["datetime"], fault_df[latency_col],  # Already in ms
-                         label="Response Latency", color="purple", linestyle=":", linewidth=2)
-                ax2.set_ylabel("Latency (ms)", color="purple")
-                ax2.tick_params(axis='y', colors="purple")
-            
-            plt.title(f"Performance Metrics During {fault.capitalize()} Fault")
-            plt.xlabel("Time")
-            plt.grid(True, alpha=0.3)
-            plt.legend()
-            
-            plt.tight_layout()
-            plt.savefig(output_dir / f"time_series_{fault}.png")
-            print(f"Created time series visualization for {fault} fault")
-        except Exception as e:
-            print(f"Error creating time series visualization for {fault} fault: {e}")
+    temp_col = column_sets.temperature[0]  # Use the first temperature column
+    gateway_col = column_sets.gateway_temp[0] if column_sets.gateway_temp else None
+    true_col = column_sets.true_temp[0] if column_sets.true_temp else None
+    latency_col = column_sets.latency[0] if column_sets.latency else None
+    # First deviation from the ground truth, if any
+    deviation_col = column_sets.true_dev[0] if column_sets.true_dev else None
+    
+    # Each fault type renders to its own PNG - spread them over worker processes,
+    # shipping only the plotted columns of each group. The datetime axis is
+    # converted once for the whole frame, not per fault
+    plot_cols = list(dict.fromkeys(
+        ["timestamp"] + [col for col in (temp_col, gateway_col, true_col, latency_col, deviation_col) if col]
+    ))
+    plot_df = df[plot_cols].assign(datetime=pd.to_datetime(df["timestamp"], unit='s'))
+    fault_groups = plot_df.groupby(df["vulnerability_type"], sort=False, observed=True)
+    
+    # Seconds since each fault's first sample, from one groupby-min over the whole frame
+    plot_df["elapsed_seconds"] = plot_df["timestamp"] - fault_groups["timestamp"].transform("min")
+    max_workers = max(1, min(fault_groups.ngroups, os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(render_fault_time_series, fault, fault_df, temp_col, gateway_col,
+                            true_col, latency_col, deviation_col, output_dir)
+            for fault, fault_df in fault_groups
+        ]
+        for future in futures:
+            future.result()
     
     # Create a comparison plot with all fault types - advanced version
+    fig = plt.figure(figsize=(15, 10))
     try:
-        plt.figure(figsize=(15, 10))
+        ax_temp, ax_dev = fig.subplots(2, 1)
         
-        # 1. Temperature subplot
-        plt.subplot(2, 1, 1)
-        
-        # Normalize time to start from 0 for each fault type
-        for fault in fault_types:
-            fault_df = df[df["vulnerability_type"] == fault].copy()
-            
-            # Skip if empty
-            if len(fault_df) == 0:
-                continue
-                
-            # Calculate elapsed seconds from start
-            start_time = fault_df["timestamp"].min()
-            fault_df["elapsed_seconds"] = fault_df["timestamp"] - start_time
-            
-            # Plot the first 60 seconds of data (or less if not available)
-            max_seconds = min(60, fault_df["elapsed_seconds"].max())
-            plot_df = fault_df[fault_df["elapsed_seconds"] <= max_seconds]
-            
-            if not plot_df.empty and temp_col in plot_df.columns:
-                plt.plot(plot_df["elapsed_seconds"], plot_df[temp_col], label=fault.capitalize())
-        
-        plt.title("Temperature Comparison Across Fault Types (First 60 Seconds)")
-        plt.ylabel("Temperature (°C)")
-        plt.grid(True, alpha=0.3)
-        plt.legend()
-        
-        # 2. Deviation subplot
-        plt.subplot(2, 1, 2)
-        
-        # For each fault type, find and plot the deviation
-        for fault in fault_types:
-            fault_df = df[df["vulnerability_type"] == fault].copy()
-            
-            # Skip if empty
-            if len(fault_df) == 0:
-                continue
-                
-            # Calculate elapsed seconds from start
-            start_time = fault_df["timestamp"].min()
-            fault_df["elapsed_seconds"] = fault_df["timestamp"] - start_time
-            
-            # Find a deviation column for this fault
-            deviation_col = None
-            for col in df.columns:
-                if "true_dev_" in col and col in fault_df.columns:
-                    deviation_col = col
-                    break
+        # Plot the first 60 seconds of each fault type (or less if not available),
+        # filling both subplots from the same pass over the groups
+        window_groups = plot_df[plot_df["elapsed_seconds"] <= 60].groupby(
+            df["vulnerability_type"], sort=False, observed=True)
+        for fault, window_df in window_groups:
+            ax_temp.plot(*decimate(window_df["elapsed_seconds"], window_df[temp_col]), label=fault.capitalize())
             
             if deviation_col:
-                # Plot the first 60 seconds of data
-                max_seconds = min(60, fault_df["elapsed_seconds"].max())
-                plot_df = fault_df[fault_df["elapsed_seconds"] <= max_seconds]
-                
-                if not plot_df.empty:
-                    plt.plot(plot_df["elapsed_seconds"], plot_df[deviation_col], 
-                             label=fault.capitalize())
-        
-        plt.title("Temperature Deviation Comparison Across Fault Types (First 60 Seconds)")
-        plt.xlabel("Elapsed Time (seconds)")
-        plt.ylabel("Deviation (°C)")
-        plt.grid(True, alpha=0.3)
-        plt.legend()
-        
-        plt.tight_layout()
-        plt.savefig(output_dir / "fault_comparison_advanced.png")
+                ax_dev.plot(*decimate(window_df["elapsed_seconds"], window_df[deviation_col]), 
+                            label=fault.capitalize())
+        
+        ax_temp.set_title("Temperature Comparison Across Fault Types (First 60 Seconds)")
+        ax_temp.set_ylabel("Temperature (°C)")
+        ax_temp.grid(True, alpha=0.3)
+        ax_temp.legend()
+        
+        ax_dev.set_title("Temperature Deviation Comparison Across Fault Types (First 60 Seconds)")
+        ax_dev.set_xlabel("Elapsed Time (seconds)")
+        ax_dev.set_ylabel("Deviation (°C)")
+        ax_dev.grid(True, alpha=0.3)
+        if deviation_col:
+            ax_dev.legend()
+        
+        fig.tight_layout()
+        fig.savefig(output_dir / "fault_comparison_advanced.png")
         print("Created advanced fault comparison visualization")
     except Exception as e:
         print(f"Error creating advanced fault comparison visualization: {e}")
+    finally:
+        plt.close(fig)
+
+def render_latency_reliability(latency_col, col_data, phases, output_dir):
+    """
+    Render the reliability and combined PNGs for a single latency column.
+    Top-level so it can run in a worker process.
+    
+    Parameters:
+    - latency_col: Latency column name
+    - col_data: Frame with the latency, its _estimated flag, datetime and phase columns
+    - phases: Unique phases of the dataset, in order of appearance
+    - output_dir: Directory to save the visualization files
+    """
+    estimated_col = f"{latency_col}_estimated"
+    
+    # Integer row positions per (phase, estimated) pair, built once with numpy
+    # and shared by both figures
+    phase_values = col_data["phase"].to_numpy()
+    is_measured = (col_data[estimated_col] == False).to_numpy()
+    is_estimated = (col_data[estimated_col] == True).to_numpy()
+    row_groups = {}
+    for phase in phases:
+        in_phase = phase_values == phase
+        row_groups[(phase, False)] = np.flatnonzero(in_phase & is_measured)
+        row_groups[(phase, True)] = np.flatnonzero(in_phase & is_estimated)
+    
+    datetimes = col_data["datetime"].to_numpy()
+    latencies = col_data[latency_col].to_numpy()
+    
+    # Create separate visualizations for reliable vs. estimated values
+    plt.figure(figsize=(12, 8))
+    
+    # Color map for phases
+    phase_colors = {
+        "baseline": "green",
+        "event": "red", 
+        "recovery": "blue"
+    }
+    
+    # Plot reliable values with solid lines
+    plt.subplot(2, 1, 1)
+    for phase in phases:
+        # Get reliable measurements for this phase
+        reliable_idx = row_groups[(phase, False)]
+        
+        if len(reliable_idx) > 0:
+            plt.plot(*decimate(datetimes[reliable_idx], latencies[reliable_idx]), 
+                     label=f"{phase.capitalize()} (measured)", 
+                     color=phase_colors.get(phase, "black"),
+                     linewidth=2)
+    
+    plt.title(f"Measured Latency Values - {latency_col}")
+    plt.ylabel("Latency (ms)")
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    
+    # Plot estimated values with dashed lines
+    plt.subplot(2, 1, 2)
+    for phase in phases:
+        # Get estimated measurements for this phase
+        estimated_idx = row_groups[(phase, True)]
+        
+        if len(estimated_idx) > 0:
+            plt.plot(*decimate(datetimes[estimated_idx], latencies[estimated_idx]), 
+                     label=f"{phase.capitalize()} (estimated)", 
+                     color=phase_colors.get(phase, "black"),
+                     linestyle='--')
+    
+    plt.title(f"Estimated Latency Values - {latency_col}")
+    plt.ylabel("Latency (ms)")
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    
+    plt.tight_layout()
+    
+    # Extract endpoint and sensor info from column name
+    parts = latency_col.split("_")
+    if len(parts) >= 4:
+        # Format is latency_ms_endpoint_sensorid
+        endpoint = parts[2]
+        sensor_id = parts[3]
+        file_name = f"latency_{endpoint}_{sensor_id}_reliability.png"
+    else:
+        # Fallback if naming convention is different
+        file_name = f"{latency_col}_reliability.png"
+    
+    plt.savefig(output_dir / file_name)
+    print(f"Created latency reliability visualization for {latency_col}")
+    
+    # Create a combined visualization with both measured and estimated values
+    plt.figure(figsize=(12, 6))
+    
+    for phase in phases:
+        # Get reliable measurements for this phase
+        reliable_idx = row_groups[(phase, False)]
+        
+        if len(reliable_idx) > 0:
+            plt.plot(*decimate(datetimes[reliable_idx], latencies[reliable_idx]), 
+                     label=f"{phase.capitalize()} (measured)", 
+                     color=phase_colors.get(phase, "black"),
+                     linewidth=2)
+        
+        # Get estimated measurements for this phase
+        estimated_idx = row_groups[(phase, True)]
+        
+        if len(estimated_idx) > 0:
+            plt.plot(*decimate(datetimes[estimated_idx], latencies[estimated_idx]), 
+                     label=f"{phase.capitalize()} (estimated)", 
+                     color=phase_colors.get(phase, "black"),
+                     linestyle='--')
+    
+    plt.title(f"Latency Values (Measured vs. Estimated) - {latency_col}")
+    plt.ylabel("Latency (ms)")
+    plt.legend()
+    plt.grid(True, alpha=0.3)
+    
+    plt.tight_layout()
+    
+    if len(parts) >= 4:
+        file_name = f"latency_{endpoint}_{sensor_id}_combined.png"
+    else:
+        file_name = f"{latency_col}_combined.png"
+    
+    plt.savefig(output_dir / file_name)
+    print(f"Created combined latency visualization for {latency_col}")
+    plt.close("all")
 
 def create_latency_visualizations(df, output_dir):
     """
@@ -414,18 +701,11 @@ def create_latency_visualizations(df, output_dir):
     - df: DataFrame with processed latency data
     - output_dir: Directory to save visualization files
     """
-    import matplotlib.pyplot as plt
-    import seaborn as sns
-    import pandas as pd
-    import numpy as np
-    from pathlib import Path
-    
     output_dir = Path(output_dir)
     output_dir.mkdir(exist_ok=True, parents=True)
     
     # Find latency columns and their corresponding estimation flag columns
-    latency_cols = [col for col in df.columns if col.startswith("latency_ms_") and 
-                   not col.endswith("_estimated") and not col.endswith("_method")]
+    latency_cols = list(classify_columns(tuple(df.columns)).latency)
     
     if not latency_cols:
         print("No latency columns found for visualization")
@@ -453,15 +733,16 @@ def create_latency_visualizations(df, output_dir):
         if summary_rows:
             summary_df = pd.DataFrame(summary_rows)
             summary_file = output_dir / "latency_estimation_summary.csv"
-            summary_df.to_csv(summary_file, index=False)
+            write_csv(summary_df, summary_file)
             print(f"Saved latency estimation summary to {summary_file}")
             
             # Create visualization of estimation methods
             plt.figure(figsize=(14, 8))
-            for i, col in enumerate(summary_df["latency_column"].unique()):
-                plt.subplot(1, len(summary_df["latency_column"].unique()), i+1)
+            method_cols = summary_df["latency_column"].unique()
+            for i, col in enumerate(method_cols):
+                plt.subplot(1, len(method_cols), i+1)
                 col_data = summary_df[summary_df["latency_column"] == col]
-                sns.barplot(x="estimation_method", y="count", data=col_data)
+                plt.bar(col_data["estimation_method"].astype(str), col_data["count"])
                 plt.title(f"Estimation Methods for {col}", fontsize=10)
                 plt.xticks(rotation=45, ha="right", fontsize=8)
                 plt.tight_layout()
@@ -469,149 +750,46 @@ def create_latency_visualizations(df, output_dir):
             plt.savefig(output_dir / "latency_estimation_methods.png")
             print("Created latency estimation methods visualization")
     
-    # Create time series visualizations that distinguish between measured and estimated values
-    for latency_col in latency_cols:
-        estimated_col = f"{latency_col}_estimated"
-        
-        if estimated_col not in df.columns:
-            continue
-            
-        # Filter to only this specific latency column data
-        col_data = df[[latency_col, estimated_col, "timestamp", "phase"]].copy()
-        col_data["datetime"] = pd.to_datetime(col_data["timestamp"], unit='s')
-        
-        # Create separate visualizations for reliable vs. estimated values
-        plt.figure(figsize=(12, 8))
-        
-        # Get unique phases
-        phases = col_data["phase"].unique()
-        
-        # Color map for phases
-        phase_colors = {
-            "baseline": "green",
-            "event": "red", 
-            "recovery": "blue"
-        }
-        
-        # Plot reliable values with solid lines
-        plt.subplot(2, 1, 1)
-        for phase in phases:
-            # Get reliable measurements for this phase
-            reliable_data = col_data[(col_data["phase"] == phase) & 
-                                    (col_data[estimated_col] == False)]
-            
-            if not reliable_data.empty:
-                plt.plot(reliable_data["datetime"], reliable_data[latency_col], 
-                         label=f"{phase.capitalize()} (measured)", 
-                         color=phase_colors.get(phase, "black"),
-                         linewidth=2)
-        
-        plt.title(f"Measured Latency Values - {latency_col}")
-        plt.ylabel("Latency (ms)")
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-        
-        # Plot estimated values with dashed lines
-        plt.subplot(2, 1, 2)
-        for phase in phases:
-            # Get estimated measurements for this phase
-            estimated_data = col_data[(col_data["phase"] == phase) & 
-                                     (col_data[estimated_col] == True)]
-            
-            if not estimated_data.empty:
-                plt.plot(estimated_data["datetime"], estimated_data[latency_col], 
-                         label=f"{phase.capitalize()} (estimated)", 
-                         color=phase_colors.get(phase, "black"),
-                         linestyle='--')
-        
-        plt.title(f"Estimated Latency Values - {latency_col}")
-        plt.ylabel("Latency (ms)")
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        
-        # Extract endpoint and sensor info from column name
-        parts = latency_col.split("_")
-        if len(parts) >= 4:
-            # Format is latency_ms_endpoint_sensorid
-            endpoint = parts[2]
-            sensor_id = parts[3]
-            file_name = f"latency_{endpoint}_{sensor_id}_reliability.png"
-        else:
-            # Fallback if naming convention is different
-            file_name = f"{latency_col}_reliability.png"
-            
-        plt.savefig(output_dir / file_name)
-        print(f"Created latency reliability visualization for {latency_col}")
-        
-        # Create a combined visualization with both measured and estimated values
-        plt.figure(figsize=(12, 6))
-        
-        for phase in phases:
-            # Get reliable measurements for this phase
-            reliable_data = col_data[(col_data["phase"] == phase) & 
-                                    (col_data[estimated_col] == False)]
-            
-            if not reliable_data.empty:
-                plt.plot(reliable_data["datetime"], reliable_data[latency_col], 
-                         label=f"{phase.capitalize()} (measured)", 
-                         color=phase_colors.get(phase, "black"),
-                         linewidth=2)
-            
-            # Get estimated measurements for this phase
-            estimated_data = col_data[(col_data["phase"] == phase) & 
-                                     (col_data[estimated_col] == True)]
-            
-            if not estimated_data.empty:
-                plt.plot(estimated_data["datetime"], estimated_data[latency_col], 
-                         label=f"{phase.capitalize()} (estimated)", 
-                         color=phase_colors.get(phase, "black"),
-                         linestyle='--')
-        
-        plt.title(f"Latency Values (Measured vs. Estimated) - {latency_col}")
-        plt.ylabel("Latency (ms)")
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        
-        if len(parts) >= 4:
-            file_name = f"latency_{endpoint}_{sensor_id}_combined.png"
-        else:
-            file_name = f"{latency_col}_combined.png"
-            
-        plt.savefig(output_dir / file_name)
-        print(f"Created combined latency visualization for {latency_col}")
-    
-    # Create visualization of the percentage of estimated vs. measured values by phase
-    estimation_by_phase = []
-    
-    for latency_col in latency_cols:
-        estimated_col = f"{latency_col}_estimated"
+    # Create time series visualizations that distinguish between measured and estimated values.
+    # Every latency column renders to its own PNGs, so spread them over worker processes
+    render_cols = [col for col in latency_cols if f"{col}_estimated" in df.columns]
+    if render_cols:
+        # Convert timestamps to datetimes and find the phases once for all latency columns
+        datetimes = pd.to_datetime(df["timestamp"], unit='s')
+        phases = df["phase"].unique()
+        max_workers = max(1, min(len(render_cols), os.cpu_count() or 1))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(render_latency_reliability, latency_col,
+                                df[[latency_col, f"{latency_col}_estimated", "phase"]].assign(datetime=datetimes),
+                                phases, output_dir)
+                for latency_col in render_cols
+            ]
+            for future in futures:
+                future.result()
+    
+    # Create visualization of the percentage of estimated vs. measured values by phase.
+    # One groupby over all _estimated columns gives the per-phase counts for every latency column
+    if render_cols:
+        estimated_cols = [f"{col}_estimated" for col in render_cols]
+        grouped = df[estimated_cols].astype(np.float64).groupby(df["phase"], sort=False, observed=True)
+        estimated_points = grouped.sum()
+        total_points = grouped.size()
+        estimated_percent = estimated_points.div(total_points, axis=0) * 100
+        measured_percent = estimated_points.rsub(total_points, axis=0).div(total_points, axis=0) * 100
+        
+        # Long format, one row per (latency column, phase)
+        num_phases = len(total_points)
+        phase_summary_df = pd.DataFrame({
+            "latency_column": np.repeat(render_cols, num_phases),
+            "phase": np.tile(total_points.index.astype(str), len(render_cols)),
+            "measured_percent": measured_percent.to_numpy().T.ravel(),
+            "estimated_percent": estimated_percent.to_numpy().T.ravel(),
+            "total_points": np.tile(total_points.to_numpy(), len(render_cols))
+        })
         
-        if estimated_col not in df.columns:
-            continue
-            
-        for phase in df["phase"].unique():
-            phase_data = df[df["phase"] == phase]
-            if not phase_data.empty:
-                total_points = len(phase_data)
-                estimated_points = phase_data[estimated_col].sum()
-                measured_points = total_points - estimated_points
-                
-                estimation_by_phase.append({
-                    "latency_column": latency_col,
-                    "phase": phase,
-                    "measured_percent": (measured_points / total_points) * 100 if total_points > 0 else 0,
-                    "estimated_percent": (estimated_points / total_points) * 100 if total_points > 0 else 0,
-                    "total_points": total_points
-                })
-    
-    if estimation_by_phase:
-        phase_summary_df = pd.DataFrame(estimation_by_phase)
         summary_file = output_dir / "latency_estimation_by_phase.csv"
-        phase_summary_df.to_csv(summary_file, index=False)
+        write_csv(phase_summary_df, summary_file)
         print(f"Saved latency estimation by phase summary to {summary_file}")
         
         # Create visualization
@@ -654,6 +832,31 @@ def create_latency_visualizations(df, output_dir):
             plt.savefig(output_dir / "latency_reliability_by_phase.png")
             print("Created latency reliability by phase visualization")
 
+def process_fault_scenario(files, fault_type, output_dir):
+    """
+    Process one fault scenario and save it to CSV. Runs in a worker process.
+    
+    Parameters:
+    - files: Scenario entry from the metadata with the data file
+    - fault_type: Fault type the scenario was recorded under
+    - output_dir: Directory to save the per-scenario CSV file
+    
+    Returns:
+    - DataFrame for the scenario (empty if no data could be extracted)
+    """
+    # Process fault dataset (using custom processor for fault datasets)
+    df = process_fault_dataset(files["data_file"], fault_type)
+    
+    if df.empty:
+        return df
+    
+    # Save to CSV
+    csv_file = output_dir / f"fault_{fault_type}.csv"
+    write_csv(df, csv_file)
+    print(f"Saved {csv_file}")
+    
+    return df
+
 def main():
     parser = argparse.ArgumentParser(description="Process sensor fault datasets")
     parser.add_argument("--metadata", required=True, help="Master metadata JSON file")
@@ -678,42 +881,56 @@ def main():
     if args.debug:
         print(f"Metadata structure: {json.dumps(metadata, indent=2)}")
     
-    # Process each fault scenario
-    all_dfs = []
+    # Collect the fault scenarios that have a data file
+    scenarios = {}
     for fault_type, files in metadata.get("fault_scenarios", {}).items():
-        print(f"\nProcessing {fault_type} fault scenario...")
-        
-        # Check if we have the data file
         if "data_file" not in files:
             print(f"WARNING: Missing data file for {fault_type} scenario. Skipping.")
             continue
-            
-        # Process fault dataset (using custom processor for fault datasets)
-        df = process_fault_dataset(files["data_file"], fault_type)
-        
-        if df.empty:
-            print(f"WARNING: No data for {fault_type} scenario. Skipping.")
-            continue
-            
-        all_dfs.append(df)
-        
-        # Save to CSV
-        csv_file = output_dir / f"fault_{fault_type}.csv"
-        df.to_csv(csv_file, index=False)
-        print(f"Saved {csv_file}")
+        scenarios[fault_type] = files
+    
+    # Process and save each fault scenario in its own worker process - the
+    # scenarios read independent files, so this is embarrassingly parallel
+    all_dfs = []
+    if scenarios:
+        max_workers = max(1, min(len(scenarios), os.cpu_count() or 1))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                fault_type: executor.submit(process_fault_scenario, files, fault_type, output_dir)
+                for fault_type, files in scenarios.items()
+            }
+            
+            # Collect in submission order so the combined dataset stays deterministic
+            for fault_type, future in futures.items():
+                print(f"\nProcessing {fault_type} fault scenario...")
+                df = future.result()
+                
+                if df.empty:
+                    print(f"WARNING: No data for {fault_type} scenario. Skipping.")
+                    continue
+                    
+                all_dfs.append(df)
     
     # Combine all scenarios
     if all_dfs:
-        all_data = pd.concat(all_dfs)
-        
-        # Standardize column names
-        if "fault_type" in all_data.columns and "vulnerability_type" not in all_data.columns:
-            all_data.rename(columns={"fault_type": "vulnerability_type"}, inplace=True)
-            
+        # Stream the combined dataset to disk one scenario at a time, aligned to the
+        # union of all columns, instead of materializing a full concatenated copy
+        all_columns = list(dict.fromkeys(col for df in all_dfs for col in df.columns))
         master_csv = output_dir / "all_fault_scenarios.csv"
-        all_data.to_csv(master_csv, index=False)
+        for i, df in enumerate(all_dfs):
+            write_csv(df.reindex(columns=all_columns), master_csv, header=(i == 0), append=(i > 0))
         print(f"Saved combined dataset to {master_csv}")
         
+        # Only the columns used by the analysis are combined in memory
+        needed_cols = analysis_columns(all_columns)
+        all_data = pd.concat([df[[col for col in needed_cols if col in df.columns]] for df in all_dfs],
+                             ignore_index=True)
+        del all_dfs
+        
+        # Categories differ per scenario, so concat falls back to strings - restore them
+        for col in categorical_columns(all_data.columns):
+            all_data[col] = all_data[col].astype("category")
+        
         # Analyze fault characteristics
         print("Analyzing fault characteristics...")
         summary_df = analyze_fault_characteristics(all_data, output_dir)
@@ -5,6 +5,7 @@ import os
 import argparse
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from data_collector import IoTDatasetCollector
 
@@ -70,18 +71,28 @@ def generate_dataset(prometheus_url, output_dir, sensor_host, sensor_port,
     # Step 2: Wait briefly
     time.sleep(10)
     
-    # Step 3: Trigger resource exhaustion
+    # Step 3: Trigger resource exhaustion in the background - the firmware
+    # request usually blocks until its timeout, so collection starts right away
+    # instead of missing the onset of the event
     print("\n=== Triggering Resource Exhaustion ===")
-    success = trigger_resource_exhaustion(sensor_host, sensor_port, event_duration)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        trigger = executor.submit(trigger_resource_exhaustion, sensor_host, sensor_port, event_duration)
+        
+        # Step 4: Collect data during resource exhaustion, stopping as soon as
+        # the trigger reports a failure (e.g. connection refused or a 4xx)
+        print("\n=== Collecting Resource Exhaustion Data ===")
+        exhaustion_file = collector.start_collection(
+            "resource_exhaustion", event_duration,
+            should_stop=lambda: trigger.done() and not trigger.result()
+        )
+        success = trigger.result()
     
     if not success:
-        print("Failed to trigger resource exhaustion. Aborting data collection.")
+        # The event data has no exhaustion in it - don't leave it on disk
+        print("Failed to trigger resource exhaustion. Discarding the collected event data.")
+        Path(exhaustion_file).unlink(missing_ok=True)
         return
     
-    # Step 4: Collect data during resource exhaustion
-    print("\n=== Collecting Resource Exhaustion Data ===")
-    exhaustion_file = collector.start_collection("resource_exhaustion", event_duration)
-    
     # Step 5: Wait for cooldown
     print(f"\n=== Cooldown period ({cooldown} seconds) ===")
     time.sleep(cooldown)
@@ -1,37 +1,93 @@
 # prepare_llm_data.py
+import os
+import re
+import sys
 import json
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain, islice
 from pathlib import Path
 import pandas as pd
 import numpy as np
 
-def clean_prometheus_data(data):
-    """Convert Prometheus data format to a cleaner format for LLMs"""
-    cleaned = {}
+# orjson is optional - fall back to the stdlib json module when it is missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Numba is optional - percent_change falls back to plain numpy when it is missing
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# fastnumbers is optional - metric values are cast with float() when it is missing
+try:
+    from fastnumbers import fast_float
+except ImportError:
+    fast_float = None
+
+from shared_metrics_utils import rows_to_columns, write_csv
+
+# JSONL output is serialized in batches and written through a large buffer
+JSONL_BATCH_SIZE = 1000
+JSONL_BUFFER_SIZE = 1 << 20
+
+# Raw datasets are read through a large buffer - the file's own line
+# iterator then splits each 4 MB block in C
+READ_BUFFER_SIZE = 4 << 20
+
+# Metric kinds reported in the text summary, matched case-insensitively in column names
+METRIC_KIND_PATTERN = re.compile(r"cpu|memory|temperature", re.IGNORECASE)
+
+@lru_cache(maxsize=None)
+def metric_column_name(metric, sensor_id, endpoint):
+    """Build (and intern) the cleaned column name for one metric/label combination"""
+    parts = [metric]
+    if sensor_id != "unknown":
+        parts.append(sensor_id)
+    if endpoint:
+        parts.append(endpoint)
+    return sys.intern("_".join(parts))
+
+def clean_prometheus_data(data, cleaned=None):
+    """
+    Convert Prometheus data format to a cleaner format for LLMs
+    
+    Args:
+        data: Raw metrics snapshot
+        cleaned: Optional dict to add the cleaned metrics to in place (e.g. one
+            already holding the record's timestamp and event fields)
+    """
+    if cleaned is None:
+        cleaned = {}
     
     for metric_name, results in data["metrics"].items():
         for result in results:
-            # Get metric name and labels
-            metric = metric_name
-            labels = result["metric"]
-            
             # Skip if no value
             if "value" not in result:
                 continue
                 
-            timestamp, value = result["value"]
+            value = result["value"][1]
             
             # Create a cleaned metric name that includes relevant labels
-            sensor_id = labels.get("sensor_id", "unknown")
-            endpoint = labels.get("endpoint", "")
-            
-            clean_name = f"{metric}"
-            if sensor_id != "unknown":
-                clean_name += f"_{sensor_id}"
-            if endpoint:
-                clean_name += f"_{endpoint}"
+            # (label combinations repeat every scrape, so names are cached)
+            labels_get = result["metric"].get
+            clean_name = metric_column_name(metric_name, labels_get("sensor_id", "unknown"), labels_get("endpoint", ""))
                 
-            # Convert value to float if possible
+            # fastnumbers converts numeric strings in C and hands anything
+            # else back unchanged, without raising
+            if fast_float is not None and isinstance(value, str):
+                cleaned[clean_name] = fast_float(value, default=value)
+                continue
+            
+            # Plain decimal strings take the fast path; everything else
+            # (exponents, NaN, labels) goes through the exception path
+            if isinstance(value, str) and value.removeprefix("-").replace(".", "", 1).isdecimal():
+                cleaned[clean_name] = float(value)
+                continue
             try:
                 cleaned[clean_name] = float(value)
             except (ValueError, TypeError):
@@ -39,6 +95,162 @@ def clean_prometheus_data(data):
     
     return cleaned
 
+def iter_clean_records(file_path, event):
+    """
+    Stream a JSONL dataset one cleaned metric record at a time
+    
+    Each line is decoded, cleaned and dropped before the next one is read,
+    so only the cleaned records the caller keeps stay in memory
+    
+    Args:
+        file_path: Path to the raw JSONL dataset
+        event: Event label attached to every record
+    """
+    loads = orjson.loads if orjson is not None else json.loads
+    with open(file_path, 'rb', buffering=READ_BUFFER_SIZE) as f:
+        for line in f:
+            data = loads(line)
+            if data.get("data_type") == "metrics":
+                # Metrics are added straight into the record - no merged copy
+                record = {"timestamp": data["timestamp"], "datetime": data["datetime"], "event": event}
+                yield clean_prometheus_data(data, record)
+
+def load_clean_records(file_path, event):
+    """Load all cleaned metric records of a JSONL dataset into a list"""
+    return list(iter_clean_records(file_path, event))
+
+def load_clean_columns(file_path, event):
+    """
+    Load the cleaned metric records of a JSONL dataset as a dict of column lists
+    
+    Column lists pickle several times faster than the per-record dicts, so
+    this is what the worker processes of load_datasets hand back
+    
+    Args:
+        file_path: Path to the raw JSONL dataset
+        event: Event label attached to every record
+    
+    Returns:
+        Tuple of (dict of column lists, number of records, middle record as a sample)
+    """
+    records = load_clean_records(file_path, event)
+    return rows_to_columns(records), len(records), records[len(records) // 2]
+
+def load_datasets(baseline_file, event_file):
+    """
+    Load the baseline and event datasets in parallel worker processes
+    
+    The two files are independent and decoding them is CPU bound, so each
+    one is parsed and cleaned in its own process. Only the columns and a
+    sample record come back, not the per-record dicts
+    
+    Args:
+        baseline_file: Path to the baseline JSONL dataset
+        event_file: Path to the resource exhaustion JSONL dataset
+    
+    Returns:
+        Tuple of the load_clean_columns results for (baseline, event)
+    """
+    if (os.cpu_count() or 1) < 2:
+        # No second core to overlap with - skip the worker start-up and pickling cost
+        return load_clean_columns(baseline_file, "baseline"), load_clean_columns(event_file, "resource_exhaustion")
+    
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        baseline = executor.submit(load_clean_columns, baseline_file, "baseline")
+        event = executor.submit(load_clean_columns, event_file, "resource_exhaustion")
+        return baseline.result(), event.result()
+
+def records_to_columns(*record_lists):
+    """
+    Collect several sequences of cleaned records into one dict of column lists
+    
+    Columns are filled directly (missing metrics become NaN), so the records
+    are never concatenated or converted row by row, and generators are
+    consumed without being materialized
+    
+    Args:
+        record_lists: Lists or iterators of record dicts, stacked in order
+    """
+    return rows_to_columns(chain.from_iterable(record_lists))
+
+def records_to_frame(*record_lists):
+    """Build one DataFrame from several sequences of cleaned records"""
+    return pd.DataFrame(records_to_columns(*record_lists))
+
+def classify_metric_columns(columns):
+    """
+    Bucket column names into CPU, memory and temperature metrics in one scan
+    
+    A column naming several kinds lands in every matching bucket
+    
+    Args:
+        columns: Iterable of column names
+    
+    Returns:
+        Tuple of (cpu_cols, mem_cols, temp_cols)
+    """
+    buckets = {"cpu": [], "memory": [], "temperature": []}
+    for col in columns:
+        for kind in dict.fromkeys(match.lower() for match in METRIC_KIND_PATTERN.findall(col)):
+            buckets[kind].append(col)
+    
+    return buckets["cpu"], buckets["memory"], buckets["temperature"]
+
+def masked_statistics(data, mask):
+    """
+    NaN-skipping mean/min/max/std of every column over the selected rows
+    
+    Args:
+        data: 2-D float array with one column per metric
+        mask: Boolean row mask selecting the rows to summarize
+    
+    Returns:
+        Dict mapping each statistic name to a 1-D array with one value per column
+    """
+    block = data[mask]
+    valid = ~np.isnan(block)
+    counts = valid.sum(axis=0)
+    
+    mean = np.full(block.shape[1], np.nan)
+    np.divide(np.where(valid, block, 0.0).sum(axis=0), counts, out=mean, where=counts > 0)
+    
+    # Sample standard deviation (ddof=1) from the deviations around the mean
+    residuals = np.where(valid, block - mean, 0.0)
+    std = np.full(block.shape[1], np.nan)
+    np.divide((residuals * residuals).sum(axis=0), counts - 1, out=std, where=counts > 1)
+    np.sqrt(std, out=std)
+    
+    return {
+        "mean": mean,
+        "min": np.fmin.reduce(block, axis=0, initial=np.nan),
+        "max": np.fmax.reduce(block, axis=0, initial=np.nan),
+        "std": std,
+    }
+
+if njit is not None:
+    @njit(parallel=True, cache=True, error_model="numpy")
+    def percent_change_kernel(base, event, out):
+        """Element-wise percent change from base to event"""
+        for i in prange(base.shape[0]):
+            out[i] = (event[i] - base[i]) / base[i] * 100.0
+
+def percent_change(base, event):
+    """
+    Percent change from the baseline means to the event means
+    
+    Args:
+        base: 1-D float array of baseline values
+        event: 1-D float array of event values, aligned with base
+    """
+    base = np.ascontiguousarray(base, dtype=np.float64)
+    event = np.ascontiguousarray(event, dtype=np.float64)
+    if njit is None:
+        return (event - base) / base * 100
+    
+    out = np.empty_like(base)
+    percent_change_kernel(base, event, out)
+    return out
+
 def prepare_for_llm(dataset_meta_file, output_format="text"):
     """
     Convert raw Prometheus datasets to LLM-friendly formats
@@ -46,6 +258,15 @@ def prepare_for_llm(dataset_meta_file, output_format="text"):
     Args:
         dataset_meta_file: Path to the metadata file linking baseline and event data
         output_format: Format of output ("text", "csv", or "jsonl")
+    
+    The CSV is written by shared_metrics_utils.write_csv, which uses pyarrow
+    when it is installed - see there for how its quoting and number
+    formatting differ from DataFrame.to_csv
+    
+    With orjson installed, the JSONL lines are compact (no space after ":"
+    and ","), NaN and infinite values are written as null and non-ASCII
+    characters as raw UTF-8. Without it, json.dumps keeps the spaced
+    separators, NaN/Infinity literals and \\u escapes
     """
     # Load metadata
     with open(dataset_meta_file, 'r') as f:
@@ -54,35 +275,6 @@ def prepare_for_llm(dataset_meta_file, output_format="text"):
     baseline_file = meta["baseline_file"]
     event_file = meta["event_file"]
     
-    # Load datasets
-    baseline_data = []
-    with open(baseline_file, 'r') as f:
-        for line in f:
-            data = json.loads(line)
-            if data.get("data_type") == "metrics":
-                baseline_data.append(data)
-    
-    event_data = []
-    with open(event_file, 'r') as f:
-        for line in f:
-            data = json.loads(line)
-            if data.get("data_type") == "metrics":
-                event_data.append(data)
-    
-    # Clean and flatten the data
-    clean_baseline = [
-        {"timestamp": item["timestamp"], "datetime": item["datetime"], "event": "baseline", **clean_prometheus_data(item)}
-        for item in baseline_data
-    ]
-    
-    clean_event = [
-        {"timestamp": item["timestamp"], "datetime": item["datetime"], "event": "resource_exhaustion", **clean_prometheus_data(item)}
-        for item in event_data
-    ]
-    
-    # Combine data
-    all_data = clean_baseline + clean_event
-    
     # Create output file path
     output_dir = Path(dataset_meta_file).parent
     base_name = f"llm_dataset_{Path(dataset_meta_file).stem}"
@@ -91,85 +283,105 @@ def prepare_for_llm(dataset_meta_file, output_format="text"):
         # Create a human-readable text description of the dataset
         output_file = output_dir / f"{base_name}.txt"
         
-        with open(output_file, 'w') as f:
-            # Write header
-            f.write("Agricultural IoT Sensor Dataset: Resource Exhaustion Event\n")
-            f.write("="*80 + "\n\n")
-            
-            # Write summary statistics
-            f.write("Dataset Summary:\n")
-            f.write(f"- Baseline period: {len(clean_baseline)} data points\n")
-            f.write(f"- Resource exhaustion period: {len(clean_event)} data points\n")
-            f.write(f"- Target sensor: {meta['sensor_host']}\n\n")
-            
-            # Calculate some statistics using pandas
-            df = pd.DataFrame(all_data)
-            
-            # Find CPU and memory columns
-            cpu_cols = [col for col in df.columns if "cpu" in col.lower()]
-            mem_cols = [col for col in df.columns if "memory" in col.lower()]
-            temp_cols = [col for col in df.columns if "temperature" in col.lower()]
-            
-            f.write("Key Metrics Comparison (Baseline vs. Resource Exhaustion):\n")
-            
-            # Group by event
-            grouped = df.groupby("event")
-            
-            # Write stats for CPU
-            if cpu_cols:
-                f.write("\nCPU Usage (%):\n")
-                for col in cpu_cols:
-                    stats = grouped[col].agg(['mean', 'max', 'std']).round(2)
-                    f.write(f"- {col}:\n")
-                    f.write(f"  Baseline: mean={stats.loc['baseline', 'mean']}, max={stats.loc['baseline', 'max']}, std={stats.loc['baseline', 'std']}\n")
-                    f.write(f"  Resource Exhaustion: mean={stats.loc['resource_exhaustion', 'mean']}, max={stats.loc['resource_exhaustion', 'max']}, std={stats.loc['resource_exhaustion', 'std']}\n")
-            
-            # Write stats for Memory
-            if mem_cols:
-                f.write("\nMemory Usage (MB):\n")
-                for col in mem_cols:
-                    stats = grouped[col].agg(['mean', 'max', 'std']).round(2)
-                    f.write(f"- {col}:\n")
-                    f.write(f"  Baseline: mean={stats.loc['baseline', 'mean']}, max={stats.loc['baseline', 'max']}, std={stats.loc['baseline', 'std']}\n")
-                    f.write(f"  Resource Exhaustion: mean={stats.loc['resource_exhaustion', 'mean']}, max={stats.loc['resource_exhaustion', 'max']}, std={stats.loc['resource_exhaustion', 'std']}\n")
-            
-            # Write stats for Temperature
-            if temp_cols:
-                f.write("\nTemperature Readings (°C):\n")
-                for col in temp_cols:
-                    stats = grouped[col].agg(['mean', 'min', 'max', 'std']).round(2)
-                    f.write(f"- {col}:\n")
-                    f.write(f"  Baseline: mean={stats.loc['baseline', 'mean']}, min={stats.loc['baseline', 'min']}, max={stats.loc['baseline', 'max']}, std={stats.loc['baseline', 'std']}\n")
-                    f.write(f"  Resource Exhaustion: mean={stats.loc['resource_exhaustion', 'mean']}, min={stats.loc['resource_exhaustion', 'min']}, max={stats.loc['resource_exhaustion', 'max']}, std={stats.loc['resource_exhaustion', 'std']}\n")
-            
-            # Write sample data points
-            f.write("\n\nSample Data Points:\n")
-            f.write("Baseline sample:\n")
-            f.write(json.dumps(clean_baseline[len(clean_baseline)//2], indent=2) + "\n\n")
-            
-            f.write("Resource Exhaustion sample:\n")
-            f.write(json.dumps(clean_event[len(clean_event)//2], indent=2) + "\n\n")
+        # The summary needs record counts and samples besides the columns
+        datasets = dict(zip(("baseline", "resource_exhaustion"), load_datasets(baseline_file, event_file)))
+        
+        # Build the report in memory and write it with a single call
+        report = []
+        write = report.append
+        
+        # Write header
+        write("Agricultural IoT Sensor Dataset: Resource Exhaustion Event\n")
+        write("="*80 + "\n\n")
+        
+        # Write summary statistics
+        write("Dataset Summary:\n")
+        write(f"- Baseline period: {datasets['baseline'][1]} data points\n")
+        write(f"- Resource exhaustion period: {datasets['resource_exhaustion'][1]} data points\n")
+        write(f"- Target sensor: {meta['sensor_host']}\n\n")
+        
+        # Calculate some statistics with plain numpy - each event's columns
+        # are summarized on their own, so no pandas groupby is needed
+        columns = dict.fromkeys(chain.from_iterable(event_columns for event_columns, _, _ in datasets.values()))
+        
+        # Find CPU and memory columns
+        cpu_cols, mem_cols, temp_cols = classify_metric_columns(columns)
+        
+        write("Key Metrics Comparison (Baseline vs. Resource Exhaustion):\n")
+        
+        # Summarize every metric column for each event at once
+        metric_cols = list(dict.fromkeys(cpu_cols + mem_cols + temp_cols))
+        if metric_cols:
+            event_stats = {}
+            for event, (event_columns, num_rows, _) in datasets.items():
+                # Metrics the event's dataset never reported are all NaN
+                data = np.column_stack([
+                    np.asarray(event_columns[col], dtype=np.float64) if col in event_columns
+                    else np.full(num_rows, np.nan)
+                    for col in metric_cols
+                ])
+                event_stats[event] = masked_statistics(data, np.ones(num_rows, dtype=bool))
             
-            # Write observation notes
-            f.write("\nKey Observations:\n")
+            # Plain {column: {event: {stat: value}}} lookups for the report lines
+            rounded_stats = {col: {} for col in metric_cols}
+            for event, stats in event_stats.items():
+                rounded = {stat: np.round(values, 2).tolist() for stat, values in stats.items()}
+                for i, col in enumerate(metric_cols):
+                    rounded_stats[col][event] = {stat: values[i] for stat, values in rounded.items()}
+        
+        # Write stats for CPU
+        if cpu_cols:
+            write("\nCPU Usage (%):\n")
             for col in cpu_cols:
-                baseline_mean = grouped[col].mean().loc['baseline']
-                event_mean = grouped[col].mean().loc['resource_exhaustion']
-                pct_increase = ((event_mean - baseline_mean) / baseline_mean * 100).round(1)
-                f.write(f"- {col}: {pct_increase}% increase during resource exhaustion\n")
-                
+                stats = rounded_stats[col]
+                write(f"- {col}:\n")
+                write(f"  Baseline: mean={stats['baseline']['mean']}, max={stats['baseline']['max']}, std={stats['baseline']['std']}\n")
+                write(f"  Resource Exhaustion: mean={stats['resource_exhaustion']['mean']}, max={stats['resource_exhaustion']['max']}, std={stats['resource_exhaustion']['std']}\n")
+        
+        # Write stats for Memory
+        if mem_cols:
+            write("\nMemory Usage (MB):\n")
             for col in mem_cols:
-                baseline_mean = grouped[col].mean().loc['baseline']
-                event_mean = grouped[col].mean().loc['resource_exhaustion']
-                pct_increase = ((event_mean - baseline_mean) / baseline_mean * 100).round(1)
-                f.write(f"- {col}: {pct_increase}% increase during resource exhaustion\n")
-                
-            # Write potential impact on agricultural operations
-            f.write("\nPotential Impact on Agricultural Operations:\n")
-            f.write("- Reduced responsiveness of temperature monitoring\n")
-            f.write("- Potential missed critical temperature thresholds\n")
-            f.write("- Increased energy consumption in resource-constrained sensors\n")
-            f.write("- Shorter battery life for field-deployed units\n")
+                stats = rounded_stats[col]
+                write(f"- {col}:\n")
+                write(f"  Baseline: mean={stats['baseline']['mean']}, max={stats['baseline']['max']}, std={stats['baseline']['std']}\n")
+                write(f"  Resource Exhaustion: mean={stats['resource_exhaustion']['mean']}, max={stats['resource_exhaustion']['max']}, std={stats['resource_exhaustion']['std']}\n")
+        
+        # Write stats for Temperature
+        if temp_cols:
+            write("\nTemperature Readings (°C):\n")
+            for col in temp_cols:
+                stats = rounded_stats[col]
+                write(f"- {col}:\n")
+                write(f"  Baseline: mean={stats['baseline']['mean']}, min={stats['baseline']['min']}, max={stats['baseline']['max']}, std={stats['baseline']['std']}\n")
+                write(f"  Resource Exhaustion: mean={stats['resource_exhaustion']['mean']}, min={stats['resource_exhaustion']['min']}, max={stats['resource_exhaustion']['max']}, std={stats['resource_exhaustion']['std']}\n")
+        
+        # Write sample data points
+        write("\n\nSample Data Points:\n")
+        write("Baseline sample:\n")
+        write(json.dumps(datasets['baseline'][2], indent=2) + "\n\n")
+        
+        write("Resource Exhaustion sample:\n")
+        write(json.dumps(datasets['resource_exhaustion'][2], indent=2) + "\n\n")
+        
+        # Write observation notes
+        write("\nKey Observations:\n")
+        if cpu_cols or mem_cols:
+            pct_increase = dict(zip(metric_cols, np.round(percent_change(
+                event_stats['baseline']['mean'], event_stats['resource_exhaustion']['mean']
+            ), 1).tolist()))
+            for col in cpu_cols + mem_cols:
+                write(f"- {col}: {pct_increase[col]}% increase during resource exhaustion\n")
+            
+        # Write potential impact on agricultural operations
+        write("\nPotential Impact on Agricultural Operations:\n")
+        write("- Reduced responsiveness of temperature monitoring\n")
+        write("- Potential missed critical temperature thresholds\n")
+        write("- Increased energy consumption in resource-constrained sensors\n")
+        write("- Shorter battery life for field-deployed units\n")
+        
+        with open(output_file, 'w') as f:
+            f.write("".join(report))
             
         print(f"Text summary generated: {output_file}")
     
@@ -177,18 +389,36 @@ def prepare_for_llm(dataset_meta_file, output_format="text"):
         # Create a JSONL file with one record per timestamp
         output_file = output_dir / f"{base_name}.jsonl"
         
-        with open(output_file, 'w') as f:
-            for item in all_data:
-                f.write(json.dumps(item) + "\n")
+        # orjson's lines are compact and write NaN as null, unlike json.dumps
+        if orjson is not None:
+            dump_line = lambda item: orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE)
+        else:
+            dump_line = lambda item: json.dumps(item).encode() + b"\n"
+        
+        # Stream the baseline then the event records straight to the output -
+        # at most one batch of JSONL_BATCH_SIZE records is held at a time, and
+        # each batch is written with a single call through a 1 MB buffer
+        records = chain(
+            iter_clean_records(baseline_file, "baseline"),
+            iter_clean_records(event_file, "resource_exhaustion"),
+        )
+        with open(output_file, 'wb', buffering=JSONL_BUFFER_SIZE) as f:
+            while batch := list(islice(records, JSONL_BATCH_SIZE)):
+                f.write(b"".join(map(dump_line, batch)))
                 
         print(f"JSONL dataset generated: {output_file}")
     
     elif output_format == "csv":
-        # Create a CSV file using pandas
+        # Create a CSV file, with pyarrow's writer when it is available (not
+        # byte-identical to DataFrame.to_csv, see write_csv)
         output_file = output_dir / f"{base_name}.csv"
         
-        df = pd.DataFrame(all_data)
-        df.to_csv(output_file, index=False)
+        # Records are streamed straight into columns and never kept as dicts
+        df = records_to_frame(
+            iter_clean_records(baseline_file, "baseline"),
+            iter_clean_records(event_file, "resource_exhaustion"),
+        )
+        write_csv(df, output_file)
         
         print(f"CSV dataset generated: {output_file}")
     
@@ -1,25 +1,226 @@
 #!/usr/bin/env python3
 # shared_metrics_utils.py - Standardized utilities for IoT sensor metrics processing
 
+import os
 import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
-def load_jsonl(file_path):
-    """Load a JSONL file into a list of dictionaries"""
-    data = []
+# orjson is optional - fall back to the stdlib json module when it is missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Numba is optional - the latency quantile kernel runs as plain Python and the
+# grouped mean/max reduction falls back to pandas groupby when it is missing
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# pyarrow is optional - CSVs are written with pandas when it is missing,
+# and tables requested as Parquet fall back to CSV
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+except ImportError:
+    pa = None
+
+# File formats the summary and impact tables can be saved in
+OUTPUT_FORMATS = ("csv", "parquet")
+
+# Debug output of the shared utilities (e.g. the snapshot structure dumps) -
+# hidden unless a processor enables it with enable_debug_logging
+logger = logging.getLogger("shared-metrics")
+
+# JSONL files are read through a large buffer so the line iterator splits big blocks
+READ_BUFFER_SIZE = 4 << 20
+
+# Column name prefix for each Prometheus metric type stored as one value per sensor
+METRIC_COLUMN_PREFIXES = {
+    "sensor_temperature": "temperature_",
+    "gateway_temperature": "gateway_temp_",
+    "dataserver_temperature": "true_temp_",
+    "sensor_cpu_usage_percent": "cpu_",
+    "sensor_memory_usage_mb": "memory_",
+    "sensor_fault_mode": "fault_code_",
+}
+
+# Metric types matched by substring, checked in order after the exact names
+METRIC_SUBSTRING_PREFIXES = (
+    # Network traffic metrics
+    ("network_sent_bytes", "network_sent_"),
+    ("network_received_bytes", "network_received_"),
+    # Additional metrics that may be present
+    ("cpu_seconds_total", "cpu_total_"),
+    ("memory_bytes_total", "memory_total_"),
+)
+
+# Metric types stored per endpoint rather than through a plain prefix
+LATENCY_BUCKET_METRIC = "sensor_request_latency_seconds_bucket"
+FAILED_REQUESTS_METRIC = "sensor_failed_requests"
+
+# Gauge metrics stored as float32 - sensor readings, CPU percentages and memory
+# in MB need no more precision. Counters with prefixes listed in
+# COUNTER_METRIC_PREFIXES stay float64, as their large values would lose precision
+GAUGE_METRIC_PREFIXES = ("temperature_", "gateway_temp_", "true_temp_", "cpu_", "memory_", "fault_code_")
+COUNTER_METRIC_PREFIXES = ("cpu_total_", "memory_total_")
+
+# Derived metrics stored as float32 alongside the gauges - temperature
+# deviations, reporting intervals and latencies in ms (the temperature z-scores
+# and rolling stats already match "temperature_"). Network rates and cumulative
+# failure counts are derived from counters and stay float64
+DERIVED_GAUGE_PREFIXES = (
+    "sensor_gateway_dev_", "sensor_true_dev_", "gateway_true_dev_",
+    "reporting_interval_", "interval_stability_", "latency_ms_", "response_time_ms"
+)
+
+# Phases produced by process_dataset - fixed categories, so renaming a phase to
+# one of them never needs a new category
+PHASE_DTYPE = pd.CategoricalDtype(["baseline", "event", "recovery"])
+
+# Quantile estimated from the latency histograms, like Prometheus histogram_quantile
+LATENCY_QUANTILE = 0.95
+
+# Estimation methods reported in the latency_ms_*_method columns, indexed by
+# the method codes of latency_quantile_kernel
+LATENCY_METHODS = (
+    "interpolation",
+    "highest_bucket",
+    "zero_counts",
+    "insufficient_buckets",
+    "only_inf_bucket",
+    "single_bucket",
+    "no_data",
+)
+
+def iter_jsonl(file_path):
+    """Stream a JSONL file one parsed record at a time, skipping malformed lines"""
+    loads = orjson.loads if orjson is not None else json.loads
     try:
-        with open(file_path, 'r') as f:
+        with open(file_path, 'rb', buffering=READ_BUFFER_SIZE) as f:
             for line in f:
                 try:
-                    data.append(json.loads(line))
+                    yield loads(line)
                 except json.JSONDecodeError as e:
                     print(f"Error parsing line in {file_path}: {e}")
     except Exception as e:
         print(f"Error loading file {file_path}: {e}")
+
+def write_csv(df, path, header=True, append=False):
+    """
+    Write a DataFrame to CSV without its index, using pyarrow's multithreaded
+    C++ writer when available and pandas to_csv otherwise
+    
+    The pyarrow output is not byte-identical to to_csv: the header and every
+    string value are quoted, whole floats drop their ".0" (100.0 -> 100) and
+    booleans are written as true/false. pd.read_csv parses both into the same
+    values, except that a float column holding only whole numbers reads back
+    as integers
     
-    return data
+    Parameters:
+    - df: DataFrame to write
+    - path: Output file path
+    - header: Whether to write the header row
+    - append: Append to an existing file instead of overwriting it
+    """
+    if pa is not None:
+        # Arrow cannot type nested objects such as the latency bucket dicts -
+        # write them as their string form, like pandas does
+        object_cols = [col for col, dtype in df.dtypes.items() if dtype == object]
+        try:
+            table = pa.Table.from_pandas(
+                df.assign(**{col: df[col].map(str, na_action='ignore') for col in object_cols}),
+                preserve_index=False
+            )
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            table = None
+        
+        if table is not None:
+            with open(path, 'ab' if append else 'wb') as f:
+                pacsv.write_csv(table, f, write_options=pacsv.WriteOptions(include_header=header))
+            return
+    
+    df.to_csv(path, mode='a' if append else 'w', header=header, index=False)
+
+def shrink_table(df):
+    """
+    Shrink a small result table's dtypes for storage - floats become float32,
+    integers the smallest integer type that holds them and text columns
+    categoricals, e.g. the repeated fault type and phase names
+    
+    Parameters:
+    - df: DataFrame such as the summary or impact table
+    
+    Returns:
+    - DataFrame with the downcast columns
+    """
+    dtypes = {}
+    for col, dtype in df.dtypes.items():
+        if pd.api.types.is_float_dtype(dtype):
+            dtypes[col] = np.float32
+        elif pd.api.types.is_integer_dtype(dtype) and len(df):
+            dtypes[col] = pd.to_numeric(df[col], downcast="integer").dtype
+        elif pd.api.types.is_string_dtype(dtype) or dtype == object:
+            dtypes[col] = "category"
+    
+    if not dtypes:
+        return df
+    return df.astype(dtypes)
+
+def write_table(df, path, output_format="csv"):
+    """
+    Write a DataFrame without its index as CSV or as zstd-compressed Parquet
+    with its dtypes shrunk by shrink_table
+    
+    Parameters:
+    - df: DataFrame to write
+    - path: Output file path; its suffix is replaced to match the format
+    - output_format: One of OUTPUT_FORMATS
+    
+    Returns:
+    - Path of the written file
+    """
+    path = Path(path)
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
+    
+    if output_format == "parquet":
+        if pa is not None:
+            # Parquet keeps the column types, so store the narrower ones
+            path = path.with_suffix(".parquet")
+            shrink_table(df).to_parquet(path, engine="pyarrow", compression="zstd", index=False)
+            return path
+        print(f"WARNING: pyarrow is not installed, writing {path.name} as CSV instead of Parquet")
+    
+    path = path.with_suffix(".csv")
+    df.to_csv(path, index=False)
+    return path
+
+def enable_debug_logging():
+    """Show the debug output of the shared utilities, such as the snapshot structure dumps"""
+    logging.basicConfig(format='%(message)s')
+    logger.setLevel(logging.DEBUG)
+
+def log_snapshot_structure(snapshot, phase):
+    """Log the metric types of a snapshot and a sample entry of each at debug level"""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    
+    logger.debug("First snapshot metrics structure (%s):", phase)
+    for metric_key, metric_value in snapshot.get("metrics", {}).items():
+        if metric_value:
+            logger.debug("  %s: %d entries", metric_key, len(metric_value))
+            logger.debug("    Sample: %s", metric_value[0])
+
+def load_jsonl(file_path):
+    """Load a JSONL file into a list of dictionaries"""
+    return list(iter_jsonl(file_path))
 
 def extract_metrics(jsonl_data, phase, vulnerability_type):
     """
@@ -46,118 +247,24 @@ def extract_metrics(jsonl_data, phase, vulnerability_type):
         print(f"Found event info: {event_info.get('event')}, started at {event_info.get('timestamp')}")
     
     # Debug first snapshot to understand structure
-    if len(jsonl_data) > 0:
+    if logger.isEnabledFor(logging.DEBUG) and len(jsonl_data) > 0:
         first_snapshot = next((s for s in jsonl_data if s.get("data_type") == "metrics"), None)
         if first_snapshot:
-            print(f"First snapshot metrics structure ({phase}):")
-            for metric_key, metric_value in first_snapshot.get("metrics", {}).items():
-                if metric_value:
-                    print(f"  {metric_key}: {len(metric_value)} entries")
-                    if len(metric_value) > 0:
-                        print(f"    Sample: {metric_value[0]}")
+            log_snapshot_structure(first_snapshot, phase)
     
     for snapshot in jsonl_data:
         if snapshot.get("data_type") != "metrics":
             continue
-            
-        timestamp = snapshot.get("timestamp")
-        
-        # Convert timestamp to human-readable format for debugging
-        human_time = ""
-        try:
-            human_time = pd.to_datetime(timestamp, unit='s').strftime('%Y-%m-%d %H:%M:%S')
-        except:
-            pass
         
-        # Create a dict with timestamp, phase and vulnerability type
-        metric_data = {
-            "timestamp": timestamp,
-            "human_time": human_time,
-            "phase": phase,
-            "vulnerability_type": vulnerability_type
-        }
-        
-        # Process each metric type
-        for metric_type, metric_entries in snapshot.get("metrics", {}).items():
-            if not metric_entries:
-                continue
-                
-            for entry in metric_entries:
-                # Get the labels from the metric
-                labels = entry.get("metric", {})
-                sensor_id = labels.get("sensor_id", "unknown")
-                
-                # Get the value from the metric
-                raw_value = entry.get("value")
-                
-                # Handle different value formats
-                if isinstance(raw_value, list) and len(raw_value) > 1:
-                    # Prometheus often returns [timestamp, value]
-                    try:
-                        value = float(raw_value[1])
-                    except (IndexError, ValueError):
-                        value = 0.0
-                elif isinstance(raw_value, list) and len(raw_value) == 1:
-                    try:
-                        value = float(raw_value[0])
-                    except (IndexError, ValueError):
-                        value = 0.0
-                else:
-                    try:
-                        value = float(raw_value)
-                    except (TypeError, ValueError):
-                        value = 0.0
-                
-                # Store the metric with appropriate name based on metric type
-                if metric_type == "sensor_temperature":
-                    metric_data[f"temperature_{sensor_id}"] = value
-                elif metric_type == "gateway_temperature":
-                    metric_data[f"gateway_temp_{sensor_id}"] = value
-                elif metric_type == "dataserver_temperature":
-                    metric_data[f"true_temp_{sensor_id}"] = value
-                elif metric_type == "sensor_cpu_usage_percent":
-                    metric_data[f"cpu_{sensor_id}"] = value
-                elif metric_type == "sensor_memory_usage_mb":
-                    metric_data[f"memory_{sensor_id}"] = value
-                elif metric_type == "sensor_fault_mode":
-                    metric_data[f"fault_code_{sensor_id}"] = value
-                elif metric_type == "sensor_request_latency_seconds_bucket":
-                    # Extract endpoint if available
-                    endpoint = labels.get("endpoint", "unknown")
-                    # Store raw latency value (will be processed later)
-                    metric_data[f"latency_{endpoint}_{sensor_id}"] = value
-                    
-                    # Also store in standardized format for latency
-                    le_value = labels.get("le", "inf")  # Get bucket upper bound
-                    if "bucket" not in metric_data:
-                        metric_data["bucket"] = {}
-                    if sensor_id not in metric_data["bucket"]:
-                        metric_data["bucket"][sensor_id] = {}
-                    if endpoint not in metric_data["bucket"][sensor_id]:
-                        metric_data["bucket"][sensor_id][endpoint] = {}
-                    
-                    metric_data["bucket"][sensor_id][endpoint][le_value] = value
-                    
-                elif metric_type == "sensor_failed_requests":
-                    endpoint = labels.get("endpoint", "unknown")
-                    metric_data[f"failed_{endpoint}_{sensor_id}"] = value
-                    
-                # Network traffic metrics
-                elif "network_sent_bytes" in metric_type:
-                    metric_data[f"network_sent_{sensor_id}"] = value
-                elif "network_received_bytes" in metric_type:
-                    metric_data[f"network_received_{sensor_id}"] = value
-                
-                # Additional metrics that may be present
-                elif "cpu_seconds_total" in metric_type:
-                    metric_data[f"cpu_total_{sensor_id}"] = value
-                elif "memory_bytes_total" in metric_type:
-                    metric_data[f"memory_total_{sensor_id}"] = value
-        
-        # Only add non-empty records
-        if len(metric_data) > 4:  # More than just timestamp, human_time, phase and vulnerability_type
+        metric_data = extract_snapshot_metrics(snapshot, phase, vulnerability_type)
+        if metric_data is not None:
             metrics.append(metric_data)
     
+    # Convert all timestamps to human-readable format in one pass
+    human_times = format_human_time([metric_data["timestamp"] for metric_data in metrics])
+    for metric_data, human_time in zip(metrics, human_times):
+        metric_data["human_time"] = human_time
+    
     print(f"Extracted {len(metrics)} valid metric snapshots for {phase} phase")
     if metrics:
         sample_keys = [k for k in metrics[0].keys() if k != "bucket"]  # Don't print bucket structure
@@ -165,6 +272,249 @@ def extract_metrics(jsonl_data, phase, vulnerability_type):
     
     return metrics
 
+def append_row(columns, row, num_rows):
+    """
+    Append one row dict to a dict of per-column lists
+    
+    A column first seen in this row is backfilled with NaN for the earlier
+    rows, and columns the row lacks are padded with NaN, so every list stays
+    num_rows + 1 long
+    
+    Parameters:
+    - columns: Dict of column lists, updated in place
+    - row: Dict of column name to value
+    - num_rows: Number of rows already in columns
+    """
+    for key, value in row.items():
+        column = columns.get(key)
+        if column is None:
+            # Column first seen in this row - backfill earlier rows
+            column = columns[key] = [np.nan] * num_rows
+        column.append(value)
+    
+    # Pad columns missing from this row so all columns stay aligned
+    if len(row) != len(columns):
+        for column in columns.values():
+            if len(column) == num_rows:
+                column.append(np.nan)
+
+def rows_to_columns(rows):
+    """
+    Collect an iterable of row dicts into one dict of column lists
+    
+    Parameters:
+    - rows: Iterable of dicts, consumed once without being materialized
+    
+    Returns:
+    - Dict of column name to list of values (NaN where a row lacked the column)
+    """
+    columns = {}
+    num_rows = 0
+    for row in rows:
+        append_row(columns, row, num_rows)
+        num_rows += 1
+    return columns
+
+def extract_metrics_frame(snapshots, phase, vulnerability_type):
+    """
+    Extract metrics straight into a column-oriented DataFrame
+    
+    Unlike extract_metrics, each snapshot's values are appended to one list per
+    column as it is read (metrics missing from a snapshot become NaN), so the
+    raw JSON records and per-snapshot dicts are never held all at once
+    
+    Parameters:
+    - snapshots: Iterable of JSON objects, e.g. the iter_jsonl stream of a JSONL file
+    - phase: Phase name (e.g., 'baseline', 'attack', 'recovery')
+    - vulnerability_type: Type of vulnerability or fault being analyzed
+    
+    Returns:
+    - DataFrame with one row per valid metrics snapshot (empty if there were none)
+    """
+    columns = {}
+    num_rows = 0
+    event_info = None
+    first_snapshot = None
+    
+    for snapshot in snapshots:
+        data_type = snapshot.get("data_type")
+        if data_type == "event_start" and event_info is None:
+            event_info = snapshot
+            print(f"Found event info: {event_info.get('event')}, started at {event_info.get('timestamp')}")
+        if data_type != "metrics":
+            continue
+        
+        # Debug first snapshot to understand structure
+        if first_snapshot is None:
+            first_snapshot = snapshot
+            log_snapshot_structure(first_snapshot, phase)
+        
+        metric_data = extract_snapshot_metrics(snapshot, phase, vulnerability_type)
+        if metric_data is None:
+            continue
+        
+        if not num_rows:
+            sample_keys = [k for k in metric_data if k != "bucket"]  # Don't print bucket structure
+        append_row(columns, metric_data, num_rows)
+        num_rows += 1
+    
+    print(f"Extracted {num_rows} valid metric snapshots for {phase} phase")
+    if not num_rows:
+        return pd.DataFrame()
+    
+    # Convert all timestamps to human-readable format in one pass
+    columns["human_time"] = format_human_time(columns["timestamp"])
+    
+    print(f"Sample metrics entry keys: {sample_keys}")
+    
+    return pd.DataFrame(columns)
+
+@lru_cache(maxsize=None)
+def metric_column_prefix(metric_type):
+    """
+    Resolve the column name prefix of a metric type once, instead of for every entry
+    
+    Returns:
+    - Prefix string, or None for metric types that are not extracted
+    """
+    prefix = METRIC_COLUMN_PREFIXES.get(metric_type)
+    if prefix is not None:
+        return prefix
+    
+    for pattern, prefix in METRIC_SUBSTRING_PREFIXES:
+        if pattern in metric_type:
+            return prefix
+    return None
+
+def format_human_time(timestamps):
+    """
+    Convert epoch timestamps to human-readable strings for debugging
+    
+    Parameters:
+    - timestamps: Sequence of timestamps in seconds since the epoch
+    
+    Returns:
+    - List of 'YYYY-MM-DD HH:MM:SS' strings, with "" for missing or invalid timestamps
+    """
+    if len(timestamps) == 0:
+        return []
+    
+    seconds = pd.to_numeric(pd.Series(timestamps, dtype=object), errors='coerce').astype('float64')
+    
+    # Values outside the datetime64[ns] range would overflow the conversion
+    in_range = seconds.between(pd.Timestamp.min.value / 1e9, pd.Timestamp.max.value / 1e9)
+    times = pd.to_datetime(seconds.where(in_range), unit='s')
+    return times.dt.strftime('%Y-%m-%d %H:%M:%S').fillna("").tolist()
+
+def extract_snapshot_metrics(snapshot, phase, vulnerability_type):
+    """
+    Extract the metrics of a single "metrics" snapshot into a flat record
+    
+    Parameters:
+    - snapshot: One JSON object of data_type "metrics" from the JSONL file
+    - phase: Phase name (e.g., 'baseline', 'attack', 'recovery')
+    - vulnerability_type: Type of vulnerability or fault being analyzed
+    
+    Returns:
+    - Dictionary with the extracted metrics, or None if the snapshot had none
+    """
+    timestamp = snapshot.get("timestamp")
+    
+    # Create a dict with timestamp, phase and vulnerability type. human_time is
+    # only a placeholder - callers fill it for all snapshots at once with
+    # format_human_time, which is far cheaper than a conversion per snapshot
+    metric_data = {
+        "timestamp": timestamp,
+        "human_time": "",
+        "phase": phase,
+        "vulnerability_type": vulnerability_type
+    }
+    
+    # Process each metric type
+    for metric_type, metric_entries in snapshot.get("metrics", {}).items():
+        if not metric_entries:
+            continue
+        
+        # Resolve how this metric type is stored once for all of its entries,
+        # skipping types that are not extracted before their values are parsed
+        is_latency = metric_type == LATENCY_BUCKET_METRIC
+        is_failed = metric_type == FAILED_REQUESTS_METRIC
+        prefix = None
+        if not (is_latency or is_failed):
+            prefix = metric_column_prefix(metric_type)
+            if prefix is None:
+                continue
+        
+        for entry in metric_entries:
+            # Get the labels from the metric
+            labels = entry.get("metric", {})
+            sensor_id = labels.get("sensor_id", "unknown")
+            
+            # Get the value from the metric. Unwrap list values with one type
+            # check - Prometheus often returns [timestamp, value] - and convert
+            # everything through a single float() call
+            raw_value = entry.get("value")
+            if type(raw_value) is list and raw_value:
+                raw_value = raw_value[1] if len(raw_value) > 1 else raw_value[0]
+            try:
+                value = float(raw_value)
+            except (TypeError, ValueError):
+                value = 0.0
+            
+            # Store the metric with appropriate name based on metric type
+            if prefix is not None:
+                metric_data[f"{prefix}{sensor_id}"] = value
+            elif is_latency:
+                # Extract endpoint if available
+                endpoint = labels.get("endpoint", "unknown")
+                # Store raw latency value (will be processed later)
+                metric_data[f"latency_{endpoint}_{sensor_id}"] = value
+                
+                # Also store in standardized format for latency
+                le_value = labels.get("le", "inf")  # Get bucket upper bound
+                if "bucket" not in metric_data:
+                    metric_data["bucket"] = {}
+                if sensor_id not in metric_data["bucket"]:
+                    metric_data["bucket"][sensor_id] = {}
+                if endpoint not in metric_data["bucket"][sensor_id]:
+                    metric_data["bucket"][sensor_id][endpoint] = {}
+                
+                metric_data["bucket"][sensor_id][endpoint][le_value] = value
+            else:
+                endpoint = labels.get("endpoint", "unknown")
+                metric_data[f"failed_{endpoint}_{sensor_id}"] = value
+    
+    # Only return non-empty records
+    if len(metric_data) > 4:  # More than just timestamp, human_time, phase and vulnerability_type
+        return metric_data
+    return None
+
+def group_columns_by_prefix(columns, prefixes):
+    """
+    Collect the columns starting with each prefix in one pass over the column names
+    
+    Prefixes are indexed by their first '_'-separated word, so each column is
+    only checked against the prefixes sharing its first word. A column matching
+    several prefixes (e.g. 'cpu_' and 'cpu_total_') is listed under each
+    
+    Parameters:
+    - columns: Iterable of column names
+    - prefixes: Column name prefixes to collect
+    
+    Returns:
+    - Dictionary mapping each prefix to its columns, in column order
+    """
+    prefixes_by_word = {}
+    for prefix in prefixes:
+        prefixes_by_word.setdefault(prefix.split("_", 1)[0], []).append(prefix)
+    
+    groups = {prefix: [] for prefix in prefixes}
+    for col in columns:
+        for prefix in prefixes_by_word.get(col.split("_", 1)[0], ()):
+            if col.startswith(prefix):
+                groups[prefix].append(col)
+    return groups
+
 def calculate_derived_metrics(df):
     """
     Calculate standardized derived metrics based on raw data
@@ -179,9 +529,6 @@ def calculate_derived_metrics(df):
         print("WARNING: Empty dataframe, skipping derived metrics calculation")
         return df
     
-    # Create a copy to avoid modifying the original
-    df = df.copy()
-        
     # Convert bucket data to proper format if it exists
     if 'bucket' in df.columns:
         # This complex bucket data will be processed separately
@@ -189,123 +536,134 @@ def calculate_derived_metrics(df):
         # Remove the bucket column after processing
         df = df.drop(columns=['bucket'])
     
+    # Derived columns are collected here and attached in one concat at the end,
+    # so the input frame is neither copied nor grown column by column
+    new_columns = {}
+    
+    # Classify the raw metric columns in one pass over the column names
+    columns = set(df.columns)
+    raw_columns = group_columns_by_prefix(df.columns, (
+        "temperature_", "gateway_temp_", "true_temp_", "network_sent_",
+        "network_received_", "latency_", "latency_ms_", "failed_"
+    ))
+    
     # Find temperature columns
-    sensor_temp_cols = [col for col in df.columns if col.startswith("temperature_")]
-    gateway_temp_cols = [col for col in df.columns if col.startswith("gateway_temp_")]
-    true_temp_cols = [col for col in df.columns if col.startswith("true_temp_")]
-    
-    # Calculate temperature deviations if we have matching columns
-    for sensor_col in sensor_temp_cols:
-        # Extract sensor ID
-        sensor_id = sensor_col.split("_", 1)[1]
-        
-        # Find corresponding gateway and true temperature columns
-        gateway_col = f"gateway_temp_{sensor_id}"
-        true_col = f"true_temp_{sensor_id}"
-        
-        if gateway_col in df.columns:
-            # Sensor vs Gateway deviation
-            df[f"sensor_gateway_dev_{sensor_id}"] = np.abs(df[sensor_col] - df[gateway_col])
-        
-        if true_col in df.columns:
-            # Sensor vs True deviation
-            df[f"sensor_true_dev_{sensor_id}"] = np.abs(df[sensor_col] - df[true_col])
-            
-            # Gateway vs True deviation (if gateway column exists)
-            if gateway_col in df.columns:
-                df[f"gateway_true_dev_{sensor_id}"] = np.abs(df[gateway_col] - df[true_col])
-    
-    # Calculate temperature reporting intervals (time between measurements)
-    for col in sensor_temp_cols:
-        # Extract sensor ID
-        sensor_id = col.split("_", 1)[1]
-        
-        # For each phase, calculate reporting intervals
-        for phase in df['phase'].unique():
-            phase_df = df[df['phase'] == phase].copy()
-            
-            if len(phase_df) > 1:
-                # Sort by timestamp
-                phase_df = phase_df.sort_values('timestamp')
-                
-                # Calculate time difference between consecutive readings
-                phase_df[f'reporting_interval_{sensor_id}'] = phase_df['timestamp'].diff()
-                
-                # Update the original dataframe
-                idx = phase_df.index
-                df.loc[idx, f'reporting_interval_{sensor_id}'] = phase_df[f'reporting_interval_{sensor_id}']
-    
-    # Calculate network traffic rates if we have the raw data
-    network_sent_cols = [col for col in df.columns if col.startswith("network_sent_")]
-    network_received_cols = [col for col in df.columns if col.startswith("network_received_")]
-    
-    # Calculate rates for sent traffic
-    for col in network_sent_cols:
-        # Extract sensor ID
-        sensor_id = col.split("_", 2)[2]
+    sensor_temp_cols = raw_columns["temperature_"]
+    gateway_temp_cols = raw_columns["gateway_temp_"]
+    true_temp_cols = raw_columns["true_temp_"]
+    
+    # Calculate temperature deviations if we have matching columns, one block
+    # subtraction per deviation kind across all sensors
+    sensor_ids = [col.split("_", 1)[1] for col in sensor_temp_cols]
+    gateway_ids = [sid for sid in sensor_ids if f"gateway_temp_{sid}" in columns]
+    true_ids = [sid for sid in sensor_ids if f"true_temp_{sid}" in columns]
+    gateway_true_ids = [sid for sid in true_ids if f"gateway_temp_{sid}" in columns]
+    
+    deviations = {}
+    for name_prefix, left_prefix, right_prefix, ids in (
+        # Sensor vs Gateway deviation
+        ("sensor_gateway_dev_", "temperature_", "gateway_temp_", gateway_ids),
+        # Sensor vs True deviation
+        ("sensor_true_dev_", "temperature_", "true_temp_", true_ids),
+        # Gateway vs True deviation
+        ("gateway_true_dev_", "gateway_temp_", "true_temp_", gateway_true_ids),
+    ):
+        if ids:
+            block = paired_abs_diff(df, left_prefix, right_prefix, ids)
+            deviations.update(zip([f"{name_prefix}{sid}" for sid in ids], block.T))
+    
+    # Keep the per-sensor column order of the deviations
+    for sensor_id in sensor_ids:
+        for name_prefix in ("sensor_gateway_dev_", "sensor_true_dev_", "gateway_true_dev_"):
+            name = f"{name_prefix}{sensor_id}"
+            if name in deviations:
+                new_columns[name] = deviations[name]
+    
+    # Calculate temperature reporting intervals (time between measurements).
+    # They only depend on the timestamps, so one per-phase diff over the rows in
+    # timestamp order serves every sensor. Work on positions, as the index
+    # repeats across the concatenated phases
+    phases = df['phase'].reset_index(drop=True)
+    phase_sizes = phases.value_counts()
+    reporting_intervals = None
+    if sensor_temp_cols and (phase_sizes > 1).any():
+        ordered = pd.DataFrame({'phase': phases, 'timestamp': df['timestamp'].to_numpy()})
+        ordered = ordered.sort_values(['phase', 'timestamp'], kind='stable')
+        reporting_intervals = ordered.groupby('phase')['timestamp'].diff().sort_index()
         
-        # Add rate column
-        df[f"network_sent_rate_{sensor_id}"] = df[col].diff() / df['timestamp'].diff()
+        for sensor_id in sensor_ids:
+            new_columns[f'reporting_interval_{sensor_id}'] = reporting_intervals.to_numpy()
     
-    # Calculate rates for received traffic
-    for col in network_received_cols:
-        # Extract sensor ID
-        sensor_id = col.split("_", 2)[2]
+    # Calculate network traffic rates if we have the raw data, differencing
+    # all sent and received counters as one block
+    network_sent_cols = raw_columns["network_sent_"]
+    network_received_cols = raw_columns["network_received_"]
+    network_cols = network_sent_cols + network_received_cols
+    
+    if network_cols:
+        time_delta = df['timestamp'].diff().to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = df[network_cols].diff().to_numpy(dtype=np.float64) / time_delta[:, None]
         
-        # Add rate column
-        df[f"network_received_rate_{sensor_id}"] = df[col].diff() / df['timestamp'].diff()
+        rate_names = ([f"network_sent_rate_{col.split('_', 2)[2]}" for col in network_sent_cols] +
+                      [f"network_received_rate_{col.split('_', 2)[2]}" for col in network_received_cols])
+        new_columns.update(zip(rate_names, rates.T))
     
     # Process latency metrics - convert to ms values if not already processed
-    latency_cols = [col for col in df.columns if col.startswith("latency_") and not col.startswith("latency_ms_")]
+    latency_ms_cols = set(raw_columns["latency_ms_"])
+    latency_cols = [col for col in raw_columns["latency_"] if col not in latency_ms_cols]
     
     if latency_cols:
-        # Create aggregated response time column if it doesn't exist yet
-        if "response_time_ms" not in df.columns:
-            df["response_time_ms"] = 0.0
+        # Convert all latency_<endpoint>_<sensor> columns to milliseconds as one block
+        summed_cols = [col for col in latency_cols if len(col.split("_", 2)) >= 3]
+        latency_ms = df[summed_cols].to_numpy(dtype=np.float64) * 1000
         
-        for col in latency_cols:
-            # Extract parts from column name
-            parts = col.split("_", 2)
-            if len(parts) >= 3:
-                endpoint = parts[1]
-                sensor_id = parts[2]
-                
-                # Convert seconds to milliseconds and store in a standardized format
-                ms_col = f"latency_ms_{endpoint}_{sensor_id}"
-                if ms_col not in df.columns:  # Only create if doesn't exist
-                    df[ms_col] = df[col] * 1000
-                
-                # Add to aggregated response time (avoiding NaN issues)
-                mask = df[col].notna()
-                df.loc[mask, "response_time_ms"] += df.loc[mask, col] * 1000
+        # Aggregated response time, skipping missing values, added onto an
+        # existing column if there is one
+        response_time = np.nansum(latency_ms, axis=1)
+        if "response_time_ms" in columns:
+            response_time += df["response_time_ms"].to_numpy(dtype=np.float64)
+        new_columns["response_time_ms"] = response_time
+        
+        # Store the millisecond values in a standardized format
+        for col, values in zip(summed_cols, latency_ms.T):
+            ms_col = f"latency_ms_{col.split('_', 1)[1]}"
+            if ms_col not in columns and ms_col not in new_columns:  # Only create if doesn't exist
+                new_columns[ms_col] = values
     
-    # Calculate rolling stats for temperature to detect anomalies
-    for col in sensor_temp_cols:
-        if len(df) >= 5:  # Need at least 5 points for meaningful stats
-            try:
-                # Calculate rolling mean and std
-                df[f"{col}_roll_mean"] = df[col].rolling(5, min_periods=1).mean()
-                df[f"{col}_roll_std"] = df[col].rolling(5, min_periods=1).std()
-                
-                # Calculate z-score to detect anomalies
-                df[f"{col}_zscore"] = np.abs((df[col] - df[f"{col}_roll_mean"]) / df[f"{col}_roll_std"].replace(0, np.nan))
-            except Exception as e:
-                print(f"Error calculating derived metrics for {col}: {e}")
-
-    # Calculate temperature reporting consistency metrics
-    for sensor_id in set(col.split("_", 1)[1] for col in sensor_temp_cols):
-        interval_col = f'reporting_interval_{sensor_id}'
+    # Calculate rolling stats for temperature to detect anomalies, over all
+    # sensor columns in one rolling pass
+    if sensor_temp_cols and len(df) >= 5:  # Need at least 5 points for meaningful stats
+        try:
+            temperatures = df[sensor_temp_cols]
+            rolling = temperatures.rolling(5, min_periods=1)
+            roll_mean = rolling.mean()
+            roll_std = rolling.std()
+            
+            # Calculate z-score to detect anomalies
+            zscore = np.abs((temperatures - roll_mean) / roll_std.replace(0, np.nan))
+            
+            for col in sensor_temp_cols:
+                new_columns[f"{col}_roll_mean"] = roll_mean[col].to_numpy()
+                new_columns[f"{col}_roll_std"] = roll_std[col].to_numpy()
+                new_columns[f"{col}_zscore"] = zscore[col].to_numpy()
+        except Exception as e:
+            print(f"Error calculating rolling temperature statistics: {e}")
+
+    # Calculate temperature reporting consistency metrics - the rolling standard
+    # deviation of the interval within each phase with enough samples
+    enough_samples = phases.map(phase_sizes > 5).fillna(False).to_numpy(dtype=bool)
+    if reporting_intervals is not None and enough_samples.any():
+        interval_stability = (reporting_intervals.groupby(phases)
+                              .rolling(5, min_periods=2).std()
+                              .reset_index(level=0, drop=True).sort_index()
+                              .where(enough_samples))
         
-        if interval_col in df.columns:
-            # Calculate interval standard deviation (stability metric)
-            for phase in df['phase'].unique():
-                phase_mask = df['phase'] == phase
-                if phase_mask.sum() > 5:  # Need enough samples
-                    df.loc[phase_mask, f'interval_stability_{sensor_id}'] = \
-                        df.loc[phase_mask, interval_col].rolling(5, min_periods=2).std()
+        for sensor_id in sensor_ids:
+            new_columns[f'interval_stability_{sensor_id}'] = interval_stability.to_numpy()
     
     # Calculate response failure rate
-    failed_req_cols = [col for col in df.columns if col.startswith("failed_")]
+    failed_req_cols = raw_columns["failed_"]
     for col in failed_req_cols:
         parts = col.split("_", 2)
         if len(parts) >= 3:
@@ -313,9 +671,109 @@ def calculate_derived_metrics(df):
             sensor_id = parts[2]
             
             # Calculate cumulative failure count
-            df[f"cumulative_failures_{endpoint}_{sensor_id}"] = df[col].cumsum()
+            new_columns[f"cumulative_failures_{endpoint}_{sensor_id}"] = df[col].cumsum().to_numpy()
     
-    return df
+    if not new_columns:
+        return df
+    
+    # Recomputed columns replace any stale copies instead of duplicating them
+    derived = pd.DataFrame(new_columns, index=df.index)
+    return pd.concat([df.drop(columns=derived.columns.intersection(df.columns)), derived], axis=1)
+
+def paired_abs_diff(df, left_prefix, right_prefix, sensor_ids):
+    """
+    Compute absolute differences between paired per-sensor columns in one block
+    
+    Parameters:
+    - df: DataFrame holding the '<left_prefix><id>' and '<right_prefix><id>' columns
+    - left_prefix, right_prefix: Column name prefixes of the two sides
+    - sensor_ids: Sensor IDs present on both sides
+    
+    Returns:
+    - 2-D array of absolute differences, one column per sensor ID
+    """
+    left = df[[f"{left_prefix}{sid}" for sid in sensor_ids]].to_numpy(dtype=np.float64)
+    right = df[[f"{right_prefix}{sid}" for sid in sensor_ids]].to_numpy(dtype=np.float64)
+    return np.abs(left - right)
+
+def latency_quantile_kernel(bounds, counts, offsets, quantile, out_latency, out_estimated, out_method):
+    """
+    Estimate a latency quantile for each histogram in flattened bucket arrays
+    
+    Histogram g holds the buckets bounds[offsets[g]:offsets[g + 1]] (sorted upper
+    bounds in seconds, inf last) with their cumulative counts. Results are
+    written to out_latency (ms), out_estimated and out_method (an index into
+    LATENCY_METHODS)
+    """
+    for g in range(offsets.shape[0] - 1):
+        start = offsets[g]
+        end = offsets[g + 1]
+        
+        if end == start:
+            # No bucket data available
+            out_latency[g] = np.nan
+            out_estimated[g] = True
+            out_method[g] = 6  # no_data
+            continue
+        
+        # Need at least two buckets for meaningful interpolation
+        if end - start >= 2:
+            # The non-inf buckets come first as the bounds are sorted
+            non_inf_end = start
+            while non_inf_end < end and bounds[non_inf_end] != np.inf:
+                non_inf_end += 1
+            
+            if non_inf_end - start >= 2:
+                # Get the inf bucket count (or use the last bucket's count if no inf bucket)
+                inf_count = counts[non_inf_end] if non_inf_end < end else counts[non_inf_end - 1]
+                
+                # Check if we have useful histogram data
+                if inf_count > 0:
+                    # Simple linear interpolation within the bucket that contains our
+                    # quantile. Bucket counts are cumulative, so they never decrease in
+                    # bound order - binary search for the first bucket reaching the
+                    # target and interpolate from the bucket before it
+                    target_count = inf_count * quantile
+                    j = start + np.searchsorted(counts[start:non_inf_end], target_count)
+                    if j == start and counts[start] == target_count:
+                        j += 1  # The target sits exactly on the lowest bucket
+                    
+                    if start < j < non_inf_end:
+                        i = j - 1
+                        count_range = counts[j] - counts[i]
+                        fraction = (target_count - counts[i]) / (count_range if count_range > 1 else 1.0)
+                        out_latency[g] = (bounds[i] + fraction * (bounds[j] - bounds[i])) * 1000
+                        out_estimated[g] = False  # Reliable calculation
+                        out_method[g] = 0  # interpolation
+                    else:
+                        # Our quantile is above all non-inf buckets - use the highest one
+                        out_latency[g] = bounds[non_inf_end - 1] * 1000
+                        out_estimated[g] = True
+                        out_method[g] = 1  # highest_bucket
+                else:
+                    # No useful count data
+                    out_latency[g] = np.nan
+                    out_estimated[g] = True
+                    out_method[g] = 2  # zero_counts
+            else:
+                # Not enough non-inf buckets
+                out_latency[g] = np.nan
+                out_estimated[g] = True
+                out_method[g] = 3  # insufficient_buckets
+        elif bounds[start] == np.inf:
+            # Only an inf bucket, which doesn't tell us anything useful
+            out_latency[g] = np.nan
+            out_estimated[g] = True
+            out_method[g] = 4  # only_inf_bucket
+        else:
+            # Only one non-inf bucket - use its upper bound
+            # This is likely a significant overestimate but clearly marked as such
+            out_latency[g] = bounds[start] * 1000
+            out_estimated[g] = True
+            out_method[g] = 5  # single_bucket
+
+if njit is not None:
+    latency_quantile_kernel = njit(cache=True)(latency_quantile_kernel)
 
 def process_latency_buckets(df):
     """
@@ -328,106 +786,71 @@ def process_latency_buckets(df):
     Returns:
     - DataFrame with additional latency_ms_* columns and is_estimated flags
     """
-    # For each row with bucket data
-    for idx, row in df.iterrows():
-        if 'bucket' not in row or not isinstance(row['bucket'], dict):
+    if 'bucket' not in df.columns:
+        return df
+    
+    # Flatten every (row, sensor, endpoint) histogram into shared bound/count
+    # arrays so the quantile estimation runs as one compiled loop
+    bounds = []
+    counts = []
+    offsets = [0]
+    group_rows = []
+    group_cols = []
+    latency_cols = {}
+    for row, bucket in enumerate(df['bucket']):
+        if not isinstance(bucket, dict):
             continue
-            
+        
         # Process each sensor's bucket data
-        for sensor_id, endpoints in row['bucket'].items():
+        for sensor_id, endpoints in bucket.items():
             for endpoint, buckets in endpoints.items():
-                # Convert bucket upper bounds to floats, handling 'inf'
+                # Convert bucket upper bounds to floats, handling 'inf', and sort them
                 bucket_bounds = {float('inf') if k == 'inf' else float(k): v for k, v in buckets.items()}
+                for bound, count in sorted(bucket_bounds.items()):
+                    bounds.append(bound)
+                    counts.append(count)
+                offsets.append(len(bounds))
                 
-                # Create the column names for this endpoint/sensor
+                # Columns are numbered in order of first appearance
                 latency_col = f"latency_ms_{endpoint}_{sensor_id}"
-                estimation_flag_col = f"{latency_col}_estimated"
-                estimation_method_col = f"{latency_col}_method"
-                
-                # Sort buckets by upper bound
-                sorted_bounds = sorted(bucket_bounds.items())
-                
-                if not sorted_bounds:
-                    # No bucket data available
-                    df.at[idx, latency_col] = float('nan')  # Use NaN instead of a default value
-                    df.at[idx, estimation_flag_col] = True
-                    df.at[idx, estimation_method_col] = "no_data"
-                    continue
-                
-                # Implement logic similar to Prometheus histogram_quantile
-                # We'll estimate the 95th percentile (0.95)
-                quantile = 0.95
-                
-                # Need at least two buckets for meaningful interpolation
-                if len(sorted_bounds) >= 2:
-                    # Get the non-inf buckets and their values
-                    non_inf_buckets = [(bound, count) for bound, count in sorted_bounds if bound != float('inf')]
-                    
-                    if non_inf_buckets and len(non_inf_buckets) >= 2:
-                        # Get the inf bucket count (or use the last bucket's count if no inf bucket)
-                        inf_count = next((count for bound, count in sorted_bounds if bound == float('inf')), 
-                                        non_inf_buckets[-1][1])
-                        
-                        # Check if we have useful histogram data
-                        if inf_count > 0:
-                            # Simple linear interpolation for quantile
-                            # Find the bucket that contains our quantile
-                            target_count = inf_count * quantile
-                            estimation_done = False
-                            
-                            for i in range(len(non_inf_buckets)):
-                                current_bound, current_count = non_inf_buckets[i]
-                                if i < len(non_inf_buckets)-1:
-                                    next_bound, next_count = non_inf_buckets[i+1]
-                                    
-                                    if current_count <= target_count <= next_count:
-                                        # Linear interpolation
-                                        fraction = (target_count - current_count) / max(1, (next_count - current_count))
-                                        estimated_latency = current_bound + fraction * (next_bound - current_bound)
-                                        df.at[idx, latency_col] = estimated_latency * 1000  # Convert to ms
-                                        df.at[idx, estimation_flag_col] = False  # Reliable calculation
-                                        df.at[idx, estimation_method_col] = "interpolation"
-                                        estimation_done = True
-                                        break
-                            
-                            if not estimation_done:
-                                # If our quantile is above all non-inf buckets
-                                # Use the highest non-inf bucket
-                                highest_bound, _ = non_inf_buckets[-1]
-                                df.at[idx, latency_col] = highest_bound * 1000  # Convert to ms
-                                df.at[idx, estimation_flag_col] = True
-                                df.at[idx, estimation_method_col] = "highest_bucket"
-                        else:
-                            # No useful count data
-                            df.at[idx, latency_col] = float('nan')
-                            df.at[idx, estimation_flag_col] = True
-                            df.at[idx, estimation_method_col] = "zero_counts"
-                    else:
-                        # Not enough non-inf buckets
-                        df.at[idx, latency_col] = float('nan')
-                        df.at[idx, estimation_flag_col] = True
-                        df.at[idx, estimation_method_col] = "insufficient_buckets"
-                else:
-                    # Only one bucket available
-                    bound, count = sorted_bounds[0]
-                    if bound == float('inf'):
-                        # Only an inf bucket, which doesn't tell us anything useful
-                        df.at[idx, latency_col] = float('nan')
-                        df.at[idx, estimation_flag_col] = True
-                        df.at[idx, estimation_method_col] = "only_inf_bucket"
-                    else:
-                        # Only one non-inf bucket - use its upper bound
-                        # This is likely a significant overestimate but clearly marked as such
-                        df.at[idx, latency_col] = bound * 1000  # Convert to ms
-                        df.at[idx, estimation_flag_col] = True
-                        df.at[idx, estimation_method_col] = "single_bucket"
+                group_rows.append(row)
+                group_cols.append(latency_cols.setdefault(latency_col, len(latency_cols)))
     
-    # Make sure all the method columns are properly handled as strings, not numeric
-    for col in df.columns:
-        if col.endswith("_method"):
-            df[col] = df[col].astype(str)
+    if not latency_cols:
+        return df
     
-    return df
+    num_groups = len(group_rows)
+    out_latency = np.empty(num_groups, dtype=np.float64)
+    out_estimated = np.empty(num_groups, dtype=np.bool_)
+    out_method = np.empty(num_groups, dtype=np.int64)
+    latency_quantile_kernel(np.array(bounds, dtype=np.float64), np.array(counts, dtype=np.float64),
+                            np.array(offsets, dtype=np.int64), LATENCY_QUANTILE,
+                            out_latency, out_estimated, out_method)
+    
+    # Scatter the results into one column per endpoint/sensor - rows without
+    # that histogram stay NaN. Flags stay object columns (True/False/NaN)
+    shape = (len(latency_cols), len(df))
+    group_index = (np.array(group_cols), np.array(group_rows))
+    latency = np.full(shape, np.nan)
+    latency[group_index] = out_latency
+    estimated = np.full(shape, np.nan, dtype=object)
+    estimated[group_index] = out_estimated.astype(object)
+    method = np.full(shape, np.nan, dtype=object)
+    method[group_index] = np.array(LATENCY_METHODS, dtype=object)[out_method]
+    
+    new_columns = {}
+    for latency_col, col in latency_cols.items():
+        new_columns[latency_col] = latency[col]
+        new_columns[f"{latency_col}_estimated"] = estimated[col]
+        new_columns[f"{latency_col}_method"] = method[col]
+    estimates = pd.DataFrame(new_columns, index=df.index)
+    
+    # Recomputed columns replace any stale copies instead of duplicating them
+    df = pd.concat([df.drop(columns=estimates.columns.intersection(df.columns)), estimates], axis=1)
+    
+    # Make sure all the method columns are properly handled as strings, not
+    # numeric - cast in one astype instead of reassigning them one by one
+    return df.astype({col: str for col in df.columns if col.endswith("_method")})
 
 def standardize_processor_output(df):
     """
@@ -472,68 +895,104 @@ def standardize_processor_output(df):
     # For now, ensure the basic ones exist
     basic_columns = ["timestamp", "human_time", "phase", "vulnerability_type", "response_time_ms"]
     
+    columns = set(df.columns)
     for col in basic_columns:
-        if col not in df.columns:
+        if col not in columns:
             df[col] = np.nan
     
     return df
 
-def process_dataset(baseline_file, event_file, recovery_file=None, vulnerability_type="unknown"):
+def downcast_gauge_metrics(df):
     """
-    Process a complete dataset (baseline, event, recovery) in a standardized way
+    Store the gauge metric columns as float32, halving their memory and the
+    bandwidth of every later pass over them. Timestamps and counters stay float64
+    
+    Run before calculate_derived_metrics this covers the raw gauges; run after
+    it, the derived gauges (DERIVED_GAUGE_PREFIXES) as well. Only float64
+    columns are cast, so flag and method columns keep their dtypes
     
     Parameters:
-    - baseline_file: Path to baseline data JSONL file
-    - event_file: Path to event/attack data JSONL file
-    - recovery_file: Path to recovery data JSONL file (optional)
-    - vulnerability_type: Type of vulnerability or fault being analyzed
+    - df: DataFrame with raw or derived metrics
     
     Returns:
-    - Combined DataFrame with all phases and derived metrics
+    - DataFrame with the gauge columns cast to float32
     """
-    # Load the data
-    print(f"Loading baseline data for {vulnerability_type} from: {baseline_file}")
-    baseline_data = load_jsonl(baseline_file)
+    gauge_prefixes = GAUGE_METRIC_PREFIXES + DERIVED_GAUGE_PREFIXES
+    groups = group_columns_by_prefix(df.columns, gauge_prefixes + COUNTER_METRIC_PREFIXES)
+    counters = {col for prefix in COUNTER_METRIC_PREFIXES for col in groups[prefix]}
+    gauge_cols = {col: np.float32 for prefix in gauge_prefixes for col in groups[prefix]
+                  if col not in counters and df[col].dtype == np.float64}
     
-    print(f"Loading event data for {vulnerability_type} from: {event_file}")
-    event_data = load_jsonl(event_file)
+    if not gauge_cols:
+        return df
+    return df.astype(gauge_cols)
+
+def load_phase_frame(file_path, phase, vulnerability_type):
+    """
+    Stream one phase's JSONL file straight into a column-oriented metrics DataFrame
     
-    recovery_data = []
-    if recovery_file:
-        print(f"Loading recovery data for {vulnerability_type} from: {recovery_file}")
-        recovery_data = load_jsonl(recovery_file)
+    Parameters:
+    - file_path: Path to the phase's JSONL file
+    - phase: Phase name (e.g., 'baseline', 'event', 'recovery')
+    - vulnerability_type: Type of vulnerability or fault being analyzed
     
-    # Extract metrics
-    print(f"Extracting baseline metrics for {vulnerability_type}...")
-    baseline_metrics = extract_metrics(baseline_data, "baseline", vulnerability_type)
+    Returns:
+    - DataFrame of the phase's metric snapshots (empty if there were none)
+    """
+    print(f"Loading {phase} data for {vulnerability_type} from: {file_path}")
+    print(f"Extracting {phase} metrics for {vulnerability_type}...")
+    return extract_metrics_frame(iter_jsonl(file_path), phase, vulnerability_type)
+
+def process_dataset(baseline_file, event_file, recovery_file=None, vulnerability_type="unknown",
+                    parallel=True):
+    """
+    Process a complete dataset (baseline, event, recovery) in a standardized way
     
-    print(f"Extracting event metrics for {vulnerability_type}...")
-    event_metrics = extract_metrics(event_data, "event", vulnerability_type)
+    Parameters:
+    - baseline_file: Path to baseline data JSONL file
+    - event_file: Path to event/attack data JSONL file (optional)
+    - recovery_file: Path to recovery data JSONL file (optional)
+    - vulnerability_type: Type of vulnerability or fault being analyzed
+    - parallel: Load the phase files in worker processes. Pass False when the
+      caller already runs inside a worker pool
     
-    recovery_metrics = []
-    if recovery_data:
-        print(f"Extracting recovery metrics for {vulnerability_type}...")
-        recovery_metrics = extract_metrics(recovery_data, "recovery", vulnerability_type)
+    Returns:
+    - Combined DataFrame with all phases and derived metrics
+    """
+    # Phases without a file are left out rather than handed to a loader
+    phase_files = [(phase, file_path)
+                   for phase, file_path in (("baseline", baseline_file), ("event", event_file),
+                                            ("recovery", recovery_file))
+                   if file_path]
     
-    # Create DataFrames
-    baseline_df = pd.DataFrame(baseline_metrics) if baseline_metrics else pd.DataFrame()
-    event_df = pd.DataFrame(event_metrics) if event_metrics else pd.DataFrame()
-    recovery_df = pd.DataFrame(recovery_metrics) if recovery_metrics else pd.DataFrame()
+    # The phase files are independent and decoding them is CPU bound, so each
+    # one is streamed into its DataFrame in its own worker process
+    if not parallel or len(phase_files) < 2 or (os.cpu_count() or 1) < 2:
+        # Nothing to overlap with - skip the worker start-up and pickling cost
+        phase_dfs = [load_phase_frame(file_path, phase, vulnerability_type) for phase, file_path in phase_files]
+    else:
+        with ProcessPoolExecutor(max_workers=len(phase_files)) as executor:
+            futures = [executor.submit(load_phase_frame, file_path, phase, vulnerability_type)
+                       for phase, file_path in phase_files]
+            phase_dfs = [future.result() for future in futures]
     
     # Combine DataFrames
-    dfs_to_combine = []
-    if not baseline_df.empty:
-        dfs_to_combine.append(baseline_df)
-    if not event_df.empty:
-        dfs_to_combine.append(event_df)
-    if not recovery_df.empty:
-        dfs_to_combine.append(recovery_df)
+    dfs_to_combine = [phase_df for phase_df in phase_dfs if not phase_df.empty]
     
     if not dfs_to_combine:
         print(f"WARNING: No data for {vulnerability_type}")
         return pd.DataFrame()
     
-    combined_df = pd.concat(dfs_to_combine)
+    # The phase frames each carry their own 0..n index; renumber the rows
+    # instead of keeping those duplicate labels, and keep the columns in
+    # extraction order rather than sorting their union
+    combined_df = pd.concat(dfs_to_combine, ignore_index=True, sort=False)
+    
+    # Phase and vulnerability type repeat on every row - store them as
+    # categoricals so masks and groupbys compare small integer codes
+    combined_df['phase'] = combined_df['phase'].astype(PHASE_DTYPE)
+    combined_df['vulnerability_type'] = combined_df['vulnerability_type'].astype('category')
+    combined_df = downcast_gauge_metrics(combined_df)
     
     # Calculate derived metrics
     print(f"Calculating derived metrics for {vulnerability_type}...")
@@ -544,7 +1003,107 @@ def process_dataset(baseline_file, event_file, recovery_file=None, vulnerability
     
     return combined_df
 
-def analyze_impact(df, output_dir, vulnerability_type="vulnerability"):
+def group_mean_max_kernel(values, codes, out_mean, out_max):
+    """Fused per-group mean and max of one column, skipping NaN, in a single sweep over its rows"""
+    sums = np.zeros(out_mean.shape[0])
+    counts = np.zeros(out_mean.shape[0], dtype=np.int64)
+    out_max[:] = -np.inf
+    
+    # Rows of a group are mostly contiguous (the phases are concatenated), so each
+    # run of equal codes is accumulated in locals and flushed when the group changes
+    group = -1
+    run_sum = 0.0
+    run_count = 0
+    run_max = -np.inf
+    for r in range(values.shape[0] + 1):
+        g = codes[r] if r < values.shape[0] else -1
+        if g != group:
+            if group >= 0:
+                sums[group] += run_sum
+                counts[group] += run_count
+                if run_max > out_max[group]:
+                    out_max[group] = run_max
+            group = g
+            run_sum = 0.0
+            run_count = 0
+            run_max = -np.inf
+        if g < 0:
+            continue
+        
+        # Selects instead of a NaN branch - NaN compares false, so it never becomes the max
+        x = values[r]
+        valid = not np.isnan(x)
+        run_sum += x if valid else 0.0
+        run_count += valid
+        if x > run_max:
+            run_max = x
+    
+    for g in range(out_mean.shape[0]):
+        if counts[g] > 0:
+            out_mean[g] = sums[g] / counts[g]
+        else:
+            out_mean[g] = np.nan
+            out_max[g] = np.nan
+
+if njit is not None:
+    group_mean_max_kernel = njit(cache=True)(group_mean_max_kernel)
+
+def group_codes(frame, keys):
+    """
+    Number the groups of rows sharing the same key values in order of first
+    appearance, like groupby with sort=False
+    
+    Parameters:
+    - frame: DataFrame holding the key columns
+    - keys: Key columns
+    
+    Returns:
+    - Array with each row's group number, -1 where a key is NaN
+    """
+    combined = np.zeros(len(frame), dtype=np.int64)
+    missing = np.zeros(len(frame), dtype=bool)
+    for key in keys:
+        key_codes, uniques = pd.factorize(frame[key])
+        combined = combined * len(uniques) + key_codes
+        missing |= key_codes < 0
+    
+    codes = np.full(len(frame), -1, dtype=np.int64)
+    codes[~missing] = pd.factorize(combined[~missing])[0]
+    return codes
+
+def group_mean_max(grouped, cols):
+    """
+    Per-group mean and maximum of numeric columns, skipping NaN like pandas.
+    With Numba, and rows stored group by group, both are computed in one fused
+    sweep over each column instead of a separate groupby reduction for each.
+    
+    Parameters:
+    - grouped: DataFrameGroupBy with sort=False over the rows holding the columns
+    - cols: Numeric columns to reduce
+    
+    Returns:
+    - Tuple of (means, maxima) DataFrames indexed by the group keys
+    """
+    codes = group_codes(grouped.obj, grouped.keys) if njit is not None and cols else None
+    
+    # The kernel relies on runs of rows from the same group - interleaved
+    # groups are left to the pandas reductions
+    if codes is None or np.count_nonzero(codes[1:] != codes[:-1]) > len(codes) // 64:
+        return grouped[cols].mean(), grouped[cols].max()
+    
+    # Each column is swept as stored (float32 or float64), without first
+    # copying all of them into one float64 block
+    index = grouped.size().index
+    means = np.empty((len(cols), len(index)))
+    maxima = np.empty((len(cols), len(index)))
+    for i, col in enumerate(cols):
+        values = grouped.obj[col].to_numpy()
+        if values.dtype.kind != "f":
+            values = grouped.obj[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        group_mean_max_kernel(values, codes, means[i], maxima[i])
+    return pd.DataFrame(means.T, index=index, columns=cols), pd.DataFrame(maxima.T, index=index, columns=cols)
+
+def analyze_impact(df, output_dir, vulnerability_type="vulnerability", output_format="csv"):
     """
     Analyze the impact of an attack/event across different fault types
     
@@ -552,6 +1111,7 @@ def analyze_impact(df, output_dir, vulnerability_type="vulnerability"):
     - df: DataFrame with processed metrics
     - output_dir: Directory to save output files
     - vulnerability_type: Type of vulnerability (e.g., 'bola', 'ddos', etc.)
+    - output_format: File format of the summary and impact tables, "csv" or "parquet"
     
     Returns:
     - Tuple of (summary_df, impact_df)
@@ -559,216 +1119,176 @@ def analyze_impact(df, output_dir, vulnerability_type="vulnerability"):
     if df.empty:
         print(f"WARNING: Empty dataframe, skipping {vulnerability_type} impact analysis")
         return pd.DataFrame(), pd.DataFrame()
-        
-    import pandas as pd
-    import numpy as np
-    from pathlib import Path
     
     # First, make sure all the method columns are properly handled as strings
     # and don't interfere with numeric calculations
-    for col in df.columns:
-        if col.endswith("_method"):
-            df[col] = df[col].astype(str)
-        elif col.startswith("latency_ms_") and not col.endswith("_estimated") and not col.endswith("_method"):
-            # Ensure all latency values are numeric
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+    method_cols = [col for col in df.columns if col.endswith("_method")]
+    if method_cols:
+        df[method_cols] = df[method_cols].astype(str)
     
     fault_types = df["vulnerability_type"].unique()
     phases = df["phase"].unique()
     
-    # Find relevant columns
-    cpu_cols = [col for col in df.columns if col.startswith("cpu_")]
-    mem_cols = [col for col in df.columns if col.startswith("memory_")]
+    # Find relevant columns - membership is tested against a set of the names
+    df_columns = set(df.columns)
+    prefixed_columns = group_columns_by_prefix(df.columns, (
+        "cpu_", "memory_", "latency_ms_", "reporting_interval_", "interval_stability_"
+    ))
+    cpu_cols = prefixed_columns["cpu_"]
+    mem_cols = prefixed_columns["memory_"]
     temp_dev_cols = [col for col in df.columns if "true_dev_" in col]
     
     # Only use latency columns that don't have estimation metadata
-    latency_ms_cols = [col for col in df.columns if col.startswith("latency_ms_") and 
-                       not col.endswith("_estimated") and not col.endswith("_method")]
+    latency_ms_cols = [col for col in prefixed_columns["latency_ms_"]
+                       if not col.endswith("_estimated") and not col.endswith("_method")]
     
-    reporting_interval_cols = [col for col in df.columns if col.startswith("reporting_interval_")]
-    interval_stability_cols = [col for col in df.columns if col.startswith("interval_stability_")]
+    reporting_interval_cols = prefixed_columns["reporting_interval_"]
+    interval_stability_cols = prefixed_columns["interval_stability_"]
     network_rate_cols = [col for col in df.columns if "network_sent_rate_" in col or "network_received_rate_" in col]
     
-    # Prepare summary statistics
-    summary = {
-        "vulnerability_type": [],
-        "fault_type": [],
-        "phase": [],
-        "avg_cpu": [],
-        "max_cpu": [],
-        "avg_memory": [],
-        "max_memory": [],
-        "avg_temp_deviation": [],
-        "max_temp_deviation": [],
-        "avg_latency_ms": [],
-        "max_latency_ms": [],
-        "avg_reporting_interval": [],
-        "interval_stability": [],
-        "network_egress_rate": [],  # Outgoing traffic
-        "measurements": []
-    }
+    latency_value_cols = latency_ms_cols or [col for col in ["response_time_ms"] if col in df_columns]
+    network_sent_rate_cols = [col for col in network_rate_cols if "sent_rate" in col]
     
-    # Generate summary statistics for each fault type and phase
-    for fault in fault_types:
-        for phase in phases:
-            phase_df = df[(df["vulnerability_type"] == fault) & (df["phase"] == phase)]
-            
-            if phase_df.empty:
-                continue
-                
-            # CPU stats
-            avg_cpu = []
-            max_cpu = []
-            for col in cpu_cols:
-                if col in phase_df.columns:
-                    avg_cpu.append(phase_df[col].mean())
-                    max_cpu.append(phase_df[col].max())
-            
-            # Memory stats
-            avg_mem = []
-            max_mem = []
-            for col in mem_cols:
-                if col in phase_df.columns:
-                    avg_mem.append(phase_df[col].mean())
-                    max_mem.append(phase_df[col].max())
-            
-            # Temperature deviation stats
-            avg_dev = []
-            max_dev = []
-            for col in temp_dev_cols:
-                if col in phase_df.columns:
-                    avg_dev.append(phase_df[col].mean())
-                    max_dev.append(phase_df[col].max())
-            
-            # Latency stats (now in ms)
-            avg_latency = []
-            max_latency = []
-            for col in latency_ms_cols:
-                if col in phase_df.columns:
-                    # Make sure values are numeric
-                    numeric_values = pd.to_numeric(phase_df[col], errors='coerce')
-                    avg_latency.append(numeric_values.mean())
-                    max_latency.append(numeric_values.max())
-                    
-            # Use response_time_ms as fallback if no specific latency columns
-            if not avg_latency and "response_time_ms" in phase_df.columns:
-                numeric_values = pd.to_numeric(phase_df["response_time_ms"], errors='coerce')
-                avg_latency = [numeric_values.mean()]
-                max_latency = [numeric_values.max()]
-            
-            # Reporting interval stats
-            avg_interval = []
-            for col in reporting_interval_cols:
-                if col in phase_df.columns:
-                    # Filter out outliers and initialization values
-                    valid_intervals = phase_df[col].dropna()
-                    valid_intervals = pd.to_numeric(valid_intervals, errors='coerce')
-                    valid_intervals = valid_intervals[valid_intervals > 0]
-                    valid_intervals = valid_intervals[valid_intervals < 30]  # Ignore gaps > 30 seconds
-                    if not valid_intervals.empty:
-                        avg_interval.append(valid_intervals.mean())
-            
-            # Interval stability stats
-            stability_metric = []
-            for col in interval_stability_cols:
-                if col in phase_df.columns:
-                    valid_stability = phase_df[col].dropna()
-                    valid_stability = pd.to_numeric(valid_stability, errors='coerce')
-                    if not valid_stability.empty:
-                        stability_metric.append(valid_stability.mean())
-            
-            # Network rate stats
-            network_rates = []
-            for col in network_rate_cols:
-                if "sent_rate" in col and col in phase_df.columns:
-                    valid_rates = phase_df[col].dropna()
-                    valid_rates = pd.to_numeric(valid_rates, errors='coerce')
-                    valid_rates = valid_rates[valid_rates > 0]
-                    if not valid_rates.empty:
-                        network_rates.append(valid_rates.mean())
-            
-            # Add to summary
-            summary["vulnerability_type"].append(vulnerability_type)
-            summary["fault_type"].append(fault)
-            summary["phase"].append(phase)
-            summary["avg_cpu"].append(np.mean(avg_cpu) if avg_cpu else np.nan)
-            summary["max_cpu"].append(np.max(max_cpu) if max_cpu else np.nan)
-            summary["avg_memory"].append(np.mean(avg_mem) if avg_mem else np.nan)
-            summary["max_memory"].append(np.max(max_mem) if max_mem else np.nan)
-            summary["avg_temp_deviation"].append(np.mean(avg_dev) if avg_dev else np.nan)
-            summary["max_temp_deviation"].append(np.max(max_dev) if max_dev else np.nan)
-            summary["avg_latency_ms"].append(np.nanmean(avg_latency) if avg_latency else np.nan)
-            summary["max_latency_ms"].append(np.nanmax(max_latency) if max_latency else np.nan)
-            summary["avg_reporting_interval"].append(np.mean(avg_interval) if avg_interval else np.nan)
-            summary["interval_stability"].append(np.mean(stability_metric) if stability_metric else np.nan)
-            summary["network_egress_rate"].append(np.mean(network_rates) if network_rates else np.nan)
-            summary["measurements"].append(len(phase_df))
-    
-    # Create summary DataFrame
-    summary_df = pd.DataFrame(summary)
-    
-    # Calculate impact metrics (comparing event phase to baseline)
-    impact_data = []
-    
-    for fault in fault_types:
-        try:
-            # Get baseline and event metrics for this fault type
-            baseline = summary_df[(summary_df["fault_type"] == fault) & (summary_df["phase"] == "baseline")]
-            event = summary_df[(summary_df["fault_type"] == fault) & (summary_df["phase"] == "event")]
-            recovery = summary_df[(summary_df["fault_type"] == fault) & (summary_df["phase"] == "recovery")]
-            
-            if baseline.empty or event.empty:
-                continue
-                
-            # Calculate impact metrics
-            impact = {
-                "vulnerability_type": vulnerability_type,
-                "fault_type": fault,
-                "detection_probability": np.nan,  # This would need to be filled manually or with model results
-                "cpu_increase_percent": calculate_percent_increase(baseline["avg_cpu"].values[0], event["avg_cpu"].values[0]),
-                "memory_increase_percent": calculate_percent_increase(baseline["avg_memory"].values[0], event["avg_memory"].values[0]),
-                "temp_deviation_increase_percent": calculate_percent_increase(baseline["avg_temp_deviation"].values[0], event["avg_temp_deviation"].values[0]),
-                "latency_increase_percent": calculate_percent_increase(baseline["avg_latency_ms"].values[0], event["avg_latency_ms"].values[0]),
-                "reporting_interval_change_percent": calculate_percent_increase(baseline["avg_reporting_interval"].values[0], event["avg_reporting_interval"].values[0]),
-                "interval_stability_change_percent": calculate_percent_increase(baseline["interval_stability"].values[0], event["interval_stability"].values[0]),
-                "network_rate_increase_percent": calculate_percent_increase(baseline["network_egress_rate"].values[0], event["network_egress_rate"].values[0])
-            }
-            
-            # Add recovery metrics if available
-            if not recovery.empty:
-                impact["recovery_cpu_ratio"] = safe_divide(recovery["avg_cpu"].values[0], baseline["avg_cpu"].values[0])
-                impact["recovery_memory_ratio"] = safe_divide(recovery["avg_memory"].values[0], baseline["avg_memory"].values[0])
-                impact["recovery_latency_ratio"] = safe_divide(recovery["avg_latency_ms"].values[0], baseline["avg_latency_ms"].values[0])
-                impact["recovery_interval_ratio"] = safe_divide(recovery["avg_reporting_interval"].values[0], baseline["avg_reporting_interval"].values[0])
-            
-            impact_data.append(impact)
-        except Exception as e:
-            print(f"Error calculating impact metrics for {fault} fault: {e}")
+    # Ensure all metric values are numeric, converting the columns that are not
+    # in one pass - process_dataset already produces floats, so usually none are
+    metric_cols = list(dict.fromkeys(
+        cpu_cols + mem_cols + temp_dev_cols + latency_ms_cols + latency_value_cols +
+        reporting_interval_cols + interval_stability_cols + network_sent_rate_cols
+    ))
+    non_numeric_cols = [col for col in metric_cols if not pd.api.types.is_numeric_dtype(df[col])]
+    if non_numeric_cols:
+        df[non_numeric_cols] = df[non_numeric_cols].apply(pd.to_numeric, errors='coerce')
+    
+    # Project the metrics each summary statistic needs into one frame, with
+    # the outlier filters applied as NaN masks
+    values = {col: df[col] for col in cpu_cols + mem_cols + temp_dev_cols + latency_value_cols + interval_stability_cols}
+    for col in reporting_interval_cols:
+        # Filter out outliers and initialization values, ignoring gaps > 30 seconds
+        intervals = df[col]
+        values[col] = intervals.where((intervals > 0) & (intervals < 30))
+    for col in network_sent_rate_cols:
+        rates = df[col]
+        values[col] = rates.where(rates > 0)
+    values["vulnerability_type"] = df["vulnerability_type"]
+    values["phase"] = df["phase"]
+    
+    # Generate summary statistics for each fault type and phase in one grouped
+    # pass - per-column means and maxima, which are then combined per metric
+    grouped = pd.DataFrame(values).groupby(["vulnerability_type", "phase"], observed=True, sort=False)
+    col_means, col_maxes = group_mean_max(grouped, list(values)[:-2])
+    
+    def combine(stats, cols, how, skipna):
+        """Combine per-column group statistics across cols, NaN when there are none"""
+        if not cols:
+            return pd.Series(np.nan, index=stats.index)
+        return getattr(stats[cols], how)(axis=1, skipna=skipna)
+    
+    summary_df = pd.DataFrame({
+        "vulnerability_type": vulnerability_type,
+        "fault_type": col_means.index.get_level_values("vulnerability_type").tolist(),
+        "phase": col_means.index.get_level_values("phase").tolist(),
+        "avg_cpu": combine(col_means, cpu_cols, "mean", False).to_numpy(),
+        "max_cpu": combine(col_maxes, cpu_cols, "max", False).to_numpy(),
+        "avg_memory": combine(col_means, mem_cols, "mean", False).to_numpy(),
+        "max_memory": combine(col_maxes, mem_cols, "max", False).to_numpy(),
+        "avg_temp_deviation": combine(col_means, temp_dev_cols, "mean", False).to_numpy(),
+        "max_temp_deviation": combine(col_maxes, temp_dev_cols, "max", False).to_numpy(),
+        "avg_latency_ms": combine(col_means, latency_value_cols, "mean", True).to_numpy(),
+        "max_latency_ms": combine(col_maxes, latency_value_cols, "max", True).to_numpy(),
+        # Columns without any valid values are left out of these averages
+        "avg_reporting_interval": combine(col_means, reporting_interval_cols, "mean", True).to_numpy(),
+        "interval_stability": combine(col_means, interval_stability_cols, "mean", True).to_numpy(),
+        "network_egress_rate": combine(col_means, network_sent_rate_cols, "mean", True).to_numpy(),  # Outgoing traffic
+        "measurements": grouped.size().to_numpy()
+    })
+    
+    # Order the rows by fault type, then phase, in order of appearance
+    fault_order = {fault: i for i, fault in enumerate(fault_types)}
+    phase_order = {phase: i for i, phase in enumerate(phases)}
+    summary_df = summary_df.sort_values(
+        ["fault_type", "phase"],
+        key=lambda keys: keys.map(fault_order if keys.name == "fault_type" else phase_order),
+        kind="stable"
+    ).reset_index(drop=True)
+    
+    # Calculate impact metrics (comparing event phase to baseline) for all
+    # fault types at once, with each phase's summary side by side as columns
+    by_phase = (summary_df.drop(columns="vulnerability_type")
+                .set_index(["fault_type", "phase"])
+                .unstack("phase")
+                .reindex(list(fault_types)))
+    
+    def phase_values(metric, phase):
+        """Summary values of a metric in a phase, one per fault type (NaN when missing)"""
+        if (metric, phase) not in by_phase.columns:
+            return np.full(len(by_phase), np.nan)
+        return by_phase[(metric, phase)].to_numpy(dtype=np.float64)
+    
+    # Only fault types with both a baseline and an event phase are compared
+    has_impact = ~np.isnan(phase_values("measurements", "baseline")) & ~np.isnan(phase_values("measurements", "event"))
+    by_phase = by_phase[has_impact]
     
-    impact_df = pd.DataFrame(impact_data)
+    def percent_change(metric):
+        """Percentage change of a metric from baseline to event for every fault type"""
+        return calculate_percent_increase(phase_values(metric, "baseline"), phase_values(metric, "event"))
     
-    # Save summary to CSV
+    def recovery_ratio(metric):
+        """Ratio of a metric's recovery value to its baseline for every fault type"""
+        return safe_divide(phase_values(metric, "recovery"), phase_values(metric, "baseline"))
+    
+    impact_df = pd.DataFrame()
+    if len(by_phase):
+        impact_df = pd.DataFrame({
+            "vulnerability_type": vulnerability_type,
+            "fault_type": by_phase.index.tolist(),
+            "detection_probability": np.nan,  # This would need to be filled manually or with model results
+            "cpu_increase_percent": percent_change("avg_cpu"),
+            "memory_increase_percent": percent_change("avg_memory"),
+            "temp_deviation_increase_percent": percent_change("avg_temp_deviation"),
+            "latency_increase_percent": percent_change("avg_latency_ms"),
+            "reporting_interval_change_percent": percent_change("avg_reporting_interval"),
+            "interval_stability_change_percent": percent_change("interval_stability"),
+            "network_rate_increase_percent": percent_change("network_egress_rate")
+        })
+        
+        # Add recovery metrics if any fault type has a recovery phase
+        if not np.isnan(phase_values("measurements", "recovery")).all():
+            impact_df["recovery_cpu_ratio"] = recovery_ratio("avg_cpu")
+            impact_df["recovery_memory_ratio"] = recovery_ratio("avg_memory")
+            impact_df["recovery_latency_ratio"] = recovery_ratio("avg_latency_ms")
+            impact_df["recovery_interval_ratio"] = recovery_ratio("avg_reporting_interval")
+    
+    # Save summary
     output_dir = Path(output_dir)
     output_dir.mkdir(exist_ok=True, parents=True)
-    summary_file = output_dir / f"{vulnerability_type}_summary.csv"
-    summary_df.to_csv(summary_file, index=False)
+    summary_file = write_table(summary_df, output_dir / f"{vulnerability_type}_summary.csv", output_format)
     print(f"Saved {vulnerability_type} summary to {summary_file}")
     
-    # Save impact metrics to CSV
-    impact_file = output_dir / f"{vulnerability_type}_impact.csv"
-    impact_df.to_csv(impact_file, index=False)
+    # Save impact metrics
+    impact_file = write_table(impact_df, output_dir / f"{vulnerability_type}_impact.csv", output_format)
     print(f"Saved {vulnerability_type} impact metrics to {impact_file}")
     
     return summary_df, impact_df
 
 def calculate_percent_increase(baseline_value, new_value):
-    """Calculate percentage increase from baseline to new value, handling NaN"""
-    if np.isnan(baseline_value) or np.isnan(new_value) or baseline_value == 0:
-        return np.nan
-    return ((new_value / baseline_value) - 1) * 100
+    """
+    Calculate percentage increase from baseline to new value, handling NaN
+    
+    Works elementwise on arrays as well as on single values; the result is
+    NaN wherever either value is NaN or the baseline is 0.
+    """
+    baseline_value = np.asarray(baseline_value, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        increase = np.where(baseline_value == 0, np.nan, (new_value / baseline_value - 1) * 100)
+    return increase[()]
 
 def safe_divide(numerator, denominator):
-    """Safely divide two values, returning NaN if denominator is 0 or NaN"""
-    if np.isnan(numerator) or np.isnan(denominator) or denominator == 0:
-        return np.nan
-    return numerator / denominator
\ No newline at end of file
+    """
+    Safely divide two values, returning NaN if denominator is 0 or NaN
+    
+    Works elementwise on arrays as well as on single values.
+    """
+    denominator = np.asarray(denominator, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        quotient = np.where(denominator == 0, np.nan, numerator / denominator)
+    return quotient[()]
@@ -0,0 +1,10 @@
+import os
+import sys
+from pathlib import Path
+
+# The processors are run as scripts from dataset-tools and import each other
+# as top-level modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# The processors import pyplot at module level - never open a window in tests
+os.environ.setdefault("MPLBACKEND", "Agg")
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import fault_dataset_processor
+from fault_dataset_processor import reduce_by_group
+
+def pandas_reference(block, starts):
+    """Per-group mean/std/max of the block's columns through pandas groupby"""
+    groups = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, block.shape[0])))
+    grouped = pd.DataFrame(block).groupby(groups)
+    reindex = lambda frame: frame.reindex(range(len(starts))).to_numpy()
+    return reindex(grouped.mean()), reindex(grouped.std()), reindex(grouped.max())
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_reduce_by_group_matches_pandas(monkeypatch, use_numba):
+    if not use_numba:
+        monkeypatch.setattr(fault_dataset_processor, "njit", None)
+    rng = np.random.default_rng(0)
+    block = rng.normal(25, 3, (40, 3))
+    block[::5, 0] = np.nan
+    block[10:20, 1] = np.nan  # Second group all NaN in this column
+    block[20, 2] = np.nan
+    # Groups of 10, 10, 1 (std undefined) and 19 rows
+    starts = np.array([0, 10, 20, 21])
+
+    for result, expected in zip(reduce_by_group(block, starts), pandas_reference(block, starts)):
+        np.testing.assert_allclose(result, expected, rtol=1e-10)
+
+def test_reduce_by_group_empty_block():
+    mean, std, maximum = reduce_by_group(np.empty((0, 2)), np.array([0]))
+    for result in (mean, std, maximum):
+        assert result.shape == (1, 2) and np.isnan(result).all()
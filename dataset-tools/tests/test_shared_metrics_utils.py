@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import shared_metrics_utils
+from shared_metrics_utils import (
+    LATENCY_METHODS,
+    group_mean_max,
+    group_mean_max_kernel,
+    latency_quantile_kernel,
+    process_latency_buckets,
+)
+
+INF = np.inf
+
+def kernel_variants(kernel):
+    """The kernel as used (compiled when Numba is installed) and its plain Python source"""
+    return [kernel, getattr(kernel, "py_func", kernel)]
+
+# (bucket upper bounds, cumulative counts, expected ms, expected method)
+HISTOGRAMS = [
+    # 95th percentile of 100 lies 9/10 of the way through the 0.5-1.0 bucket
+    ([0.1, 0.5, 1.0, INF], [10, 50, 100, 100], 950.0, "interpolation"),
+    # Target sits exactly on the lowest bucket's count
+    ([0.1, 0.2, INF], [95, 100, 100], 100.0, "interpolation"),
+    # Quantile above every finite bucket
+    ([0.1, 0.5, 1.0, INF], [10, 50, 90, 100], 1000.0, "highest_bucket"),
+    ([0.1, 0.5, INF], [0, 0, 0], np.nan, "zero_counts"),
+    ([0.5, INF], [5, 10], np.nan, "insufficient_buckets"),
+    ([INF], [10], np.nan, "only_inf_bucket"),
+    ([0.25], [10], 250.0, "single_bucket"),
+    ([], [], np.nan, "no_data"),
+]
+
+@pytest.mark.parametrize("kernel", kernel_variants(latency_quantile_kernel))
+def test_latency_quantile_kernel_method_codes(kernel):
+    bounds = np.array([b for h in HISTOGRAMS for b in h[0]], dtype=np.float64)
+    counts = np.array([c for h in HISTOGRAMS for c in h[1]], dtype=np.float64)
+    offsets = np.cumsum([0] + [len(h[0]) for h in HISTOGRAMS]).astype(np.int64)
+
+    out_latency = np.empty(len(HISTOGRAMS))
+    out_estimated = np.empty(len(HISTOGRAMS), dtype=np.bool_)
+    out_method = np.empty(len(HISTOGRAMS), dtype=np.int64)
+    kernel(bounds, counts, offsets, 0.95, out_latency, out_estimated, out_method)
+
+    np.testing.assert_allclose(out_latency, [h[2] for h in HISTOGRAMS])
+    assert [LATENCY_METHODS[m] for m in out_method] == [h[3] for h in HISTOGRAMS]
+    assert out_estimated.tolist() == [h[3] != "interpolation" for h in HISTOGRAMS]
+
+def test_latency_quantile_kernel_no_histograms():
+    out = np.empty(0)
+    latency_quantile_kernel(np.empty(0), np.empty(0), np.zeros(1, dtype=np.int64), 0.95,
+                            out, np.empty(0, dtype=np.bool_), np.empty(0, dtype=np.int64))
+    assert out.shape == (0,)
+
+def test_process_latency_buckets_scatters_per_column():
+    df = pd.DataFrame({
+        "timestamp": [0.0, 1.0, 2.0],
+        "bucket": [
+            {"s1": {"temp": {"0.1": 10, "0.5": 50, "1.0": 100, "inf": 100}}},
+            None,
+            {"s1": {"temp": {"0.25": 10}}, "s2": {"temp": {"inf": 3}}},
+        ],
+    })
+    out = process_latency_buckets(df)
+
+    np.testing.assert_allclose(out["latency_ms_temp_s1"], [950.0, np.nan, 250.0])
+    assert out["latency_ms_temp_s1_method"].tolist()[::2] == ["interpolation", "single_bucket"]
+    assert out["latency_ms_temp_s1_estimated"].tolist()[::2] == [False, True]
+    assert out["latency_ms_temp_s2_method"].isna().tolist() == [True, True, False]
+    assert out["latency_ms_temp_s2_method"].iloc[2] == "only_inf_bucket"
+
+@pytest.mark.parametrize("kernel", kernel_variants(group_mean_max_kernel))
+def test_group_mean_max_kernel_runs_and_empty_groups(kernel):
+    # Group 0 appears in two runs, group 1 is all NaN, group 2 never appears,
+    # rows coded -1 (NaN key) are skipped
+    values = np.array([1.0, 3.0, np.nan, np.nan, 100.0, 5.0, np.nan])
+    codes = np.array([0, 0, 1, 1, -1, 0, 0], dtype=np.int64)
+    out_mean = np.empty(3)
+    out_max = np.empty(3)
+    kernel(values, codes, out_mean, out_max)
+
+    np.testing.assert_allclose(out_mean, [3.0, np.nan, np.nan])
+    np.testing.assert_allclose(out_max, [5.0, np.nan, np.nan])
+
+@pytest.mark.parametrize("kernel", kernel_variants(group_mean_max_kernel))
+def test_group_mean_max_kernel_no_rows(kernel):
+    out_mean = np.empty(2)
+    out_max = np.empty(2)
+    kernel(np.empty(0), np.empty(0, dtype=np.int64), out_mean, out_max)
+    assert np.isnan(out_mean).all() and np.isnan(out_max).all()
+
+def grouped_frame(num_rows, interleaved):
+    """Rows of three (fault, phase) groups - stored group by group or interleaved"""
+    rng = np.random.default_rng(0)
+    group = np.arange(num_rows) % 3 if interleaved else np.arange(num_rows) * 3 // num_rows
+    df = pd.DataFrame({
+        "vulnerability_type": pd.Categorical(np.where(group == 2, "b", "a")),
+        "phase": pd.Categorical(np.array(["baseline", "event", "baseline"])[group]),
+        "cpu": rng.normal(50, 10, num_rows),
+        "temp": rng.normal(25, 2, num_rows).astype(np.float32),
+        "count": rng.integers(0, 10, num_rows),
+    })
+    df.loc[::7, "cpu"] = np.nan
+    df.loc[group == 1, "temp"] = np.nan
+    return df
+
+@pytest.mark.parametrize("interleaved", [False, True])
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_group_mean_max_matches_pandas(monkeypatch, interleaved, use_numba):
+    if not use_numba:
+        monkeypatch.setattr(shared_metrics_utils, "njit", None)
+    df = grouped_frame(300, interleaved)
+    grouped = df.groupby(["vulnerability_type", "phase"], observed=True, sort=False)
+    cols = ["cpu", "temp", "count"]
+
+    means, maxima = group_mean_max(grouped, cols)
+
+    pd.testing.assert_frame_equal(means, grouped[cols].mean(), check_dtype=False, rtol=1e-6)
+    pd.testing.assert_frame_equal(maxima, grouped[cols].max(), check_dtype=False)
+
+def test_group_mean_max_skips_missing_keys():
+    df = pd.DataFrame({
+        "vulnerability_type": pd.Categorical(["a", "a", None, "b"]),
+        "phase": pd.Categorical(["event"] * 4),
+        "cpu": [1.0, 2.0, 50.0, 4.0],
+    })
+    grouped = df.groupby(["vulnerability_type", "phase"], observed=True, sort=False)
+    means, maxima = group_mean_max(grouped, ["cpu"])
+
+    assert means["cpu"].tolist() == [1.5, 4.0]
+    assert maxima["cpu"].tolist() == [2.0, 4.0]
@@ -1,12 +1,40 @@
 import requests
+from requests.adapters import HTTPAdapter
 import time
 import json
 import matplotlib.pyplot as plt
 import pandas as pd
+import numpy as np
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+# orjson is optional - fall back to the responses' own json() decoding when it is missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Polars is optional - the collected data is written with pandas when it is missing
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# One session for all requests, so each measurement reuses pooled keep-alive
+# connections to the sensor and the data server instead of opening new ones
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+
+# Connect and read timeouts in seconds - a reply slower than the measurement
+# interval is reported as a failed request rather than stalling the scenario
+REQUEST_TIMEOUT = (1, 5)
+
+# Threads that issue the independent requests of one measurement at once, so it
+# takes the slowest round trip instead of the sum of all three
+REQUEST_POOL = ThreadPoolExecutor(max_workers=3)
+
 # Configure logging
 def setup_logging(log_level=logging.INFO):
     log_format = '%(asctime)s - %(levelname)s - %(message)s'
@@ -20,20 +48,27 @@ def setup_logging(log_level=logging.INFO):
     )
     return logging.getLogger()
 
+def decode_json(resp):
+    """Decode the JSON body of a response, with orjson when it is available"""
+    if orjson is not None:
+        return orjson.loads(resp.content)
+    return resp.json()
+
 def collect_data_point(logger, sensor_url, data_server_url, event_type):
     """Collect a single data point from sensors and ground truth"""
     try:
         # Get sensor reading (what the system reports)
-        sensor_resp = requests.get(f"{sensor_url}/temperature")
-        sensor_data = sensor_resp.json()
+        sensor_future = REQUEST_POOL.submit(SESSION.get, f"{sensor_url}/temperature", timeout=REQUEST_TIMEOUT)
         
         # Get ground truth from data server
-        truth_resp = requests.get(f"{data_server_url}/environment/TEMP001")
-        truth_data = truth_resp.json()
+        truth_future = REQUEST_POOL.submit(SESSION.get, f"{data_server_url}/environment/TEMP001", timeout=REQUEST_TIMEOUT)
         
         # Get sensor resource usage
-        health_resp = requests.get(f"{sensor_url}/health")
-        health_data = health_resp.json()
+        health_future = REQUEST_POOL.submit(SESSION.get, f"{sensor_url}/health", timeout=REQUEST_TIMEOUT)
+        
+        sensor_data = decode_json(sensor_future.result())
+        truth_data = decode_json(truth_future.result())
+        health_data = decode_json(health_future.result())
         
         reported_temp = sensor_data["temperature"]
         actual_temp = truth_data["temperature"]
@@ -55,12 +90,20 @@ def collect_data_point(logger, sensor_url, data_server_url, event_type):
         logger.error(f"Unexpected error during {event_type}: {e}")
         return None
     
+def sleep_until(deadline):
+    """
+    Sleep until a time.monotonic() deadline. Measurements are scheduled on fixed
+    deadlines, so the time spent collecting one does not stretch the interval
+    """
+    time.sleep(max(0.0, deadline - time.monotonic()))
+
 def check_active_events(logger, data_server_url):
     """Check the currently active weather events"""
     try:
-        events_resp = requests.get(
+        events_resp = SESSION.get(
             f"{data_server_url}/events",
-            headers={"X-API-Key": "INSECURE_API_KEY"}
+            headers={"X-API-Key": "INSECURE_API_KEY"},
+            timeout=REQUEST_TIMEOUT
         )
         
         if events_resp.status_code == 200:
@@ -84,9 +127,10 @@ def check_active_events(logger, data_server_url):
 def cleanup_events(logger, data_server_url):
     """Clean up any active weather events"""
     try:
-        cleanup_resp = requests.post(
+        cleanup_resp = SESSION.post(
             f"{data_server_url}/events/clear",
-            headers={"X-API-Key": "INSECURE_API_KEY"}
+            headers={"X-API-Key": "INSECURE_API_KEY"},
+            timeout=REQUEST_TIMEOUT
         )
         
         if cleanup_resp.status_code == 200:
@@ -102,10 +146,11 @@ def cleanup_sensor_events(logger, sensor_url):
         """Clean up any active faults or events on the sensor"""
         try:
         # Clear any active faults
-            fault_resp = requests.post(
+            fault_resp = SESSION.post(
                 f"{sensor_url}/simulate/fault",
                 json={"fault_mode": "none"},
-                auth=("admin", "admin")
+                auth=("admin", "admin"),
+                timeout=REQUEST_TIMEOUT
             )
             if fault_resp.status_code == 200:
                 logger.info("Sensor faults cleared successfully.")
@@ -120,25 +165,32 @@ def generate_visualization(data, measurement_interval):
     logger.info("Creating visualization of tomato greenhouse scenario...")
     
     df = pd.DataFrame(data)
+    # Only three event names repeat on every row - group on their category codes
+    df["event"] = df["event"].astype("category")
 
-    # Calculate time relative to start
-    df["relative_time"] = df["timestamp"] - df["timestamp"].iloc[0]
+    # Calculate time relative to start - the plots and annotations below use
+    # plain numpy arrays instead of indexing the Series each time
+    timestamps = df["timestamp"].to_numpy()
+    relative_time = timestamps - timestamps[0]
+    df["relative_time"] = relative_time
+    reported_temp = df["reported_temp"].to_numpy()
+    actual_temp = df["actual_temp"].to_numpy()
 
     # Calculate estimated yield impact
-    time_above_threshold = sum(1 for temp in df["actual_temp"] if temp > 35) * measurement_interval / 60
+    time_above_threshold = np.count_nonzero(actual_temp > 35) * measurement_interval / 60
     yield_impact = min(time_above_threshold * 0.5, 30)  # Cap at 30%
 
     # Create two subplots - one for temperature and one for CPU usage
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), gridspec_kw={'height_ratios': [3, 1]})
 
     # Top plot: Temperature
-    ax1.plot(df["relative_time"], df["reported_temp"], label="Reported Temperature", marker="o", color="blue")
-    ax1.plot(df["relative_time"], df["actual_temp"], label="Actual Temperature", marker="x", color="red")
+    ax1.plot(relative_time, reported_temp, label="Reported Temperature", marker="o", color="blue")
+    ax1.plot(relative_time, actual_temp, label="Actual Temperature", marker="x", color="red")
 
     # Add event regions to the temperature plot
-    event_regions = df.groupby("event")["relative_time"].agg(["min", "max"])
+    event_regions = df.groupby("event", observed=True)["relative_time"].agg(["min", "max"])
     colors = {"Normal Operation": "green", "Heatwave": "orange", "Attack Active": "red"}
-    for event, (start, end) in event_regions.iterrows():
+    for event, start, end in event_regions.itertuples(name=None):
         ax1.axvspan(start, end, alpha=0.2, color=colors[event])
 
     # Add safe zone for tomatoes
@@ -151,11 +203,11 @@ def generate_visualization(data, measurement_interval):
     #     ax2.axvspan(start, end, alpha=0.2, color=colors[event], label=f"{event}")
 
     # Annotations and formatting
-    max_temp = df["actual_temp"].max()
-    max_temp_idx = df["actual_temp"].idxmax()
+    max_temp_idx = int(np.nanargmax(actual_temp))
+    max_temp = float(actual_temp[max_temp_idx])
     ax1.annotate(f"Max Temperature: {max_temp:.1f}°C",
-                 xy=(df["relative_time"].iloc[max_temp_idx], max_temp),
-                 xytext=(df["relative_time"].iloc[max_temp_idx] + 5, max_temp + 2),
+                 xy=(relative_time[max_temp_idx], max_temp),
+                 xytext=(relative_time[max_temp_idx] + 5, max_temp + 2),
                  arrowprops=dict(facecolor="black", arrowstyle="->"),
                  bbox=dict(boxstyle="round,pad=0.3", edgecolor="black", facecolor="white"))
 
@@ -186,7 +238,11 @@ def generate_visualization(data, measurement_interval):
     
     # Save data for further analysis
     csv_filename = f"tomato_greenhouse_ddos_attack_data_{timestamp}.csv"
-    df.to_csv(csv_filename, index=False)
+    if pl is not None:
+        # Build from plain numpy columns (no pyarrow needed) for Polars' native CSV writer
+        pl.DataFrame({col: df[col].to_numpy() for col in df.columns}).write_csv(csv_filename)
+    else:
+        df.to_csv(csv_filename, index=False)
     logger.info(f"Data saved to {csv_filename}")
     
     return yield_impact
@@ -210,11 +266,13 @@ def main():
     try:
         # Step 1: Monitor baseline temperature
         logger.info("Monitoring baseline temperature for tomato greenhouse...")
+        next_measurement = time.monotonic()
         for i in range(6):  # 30 seconds of baseline
             data_point = collect_data_point(logger, SENSOR_URL, DATA_SERVER_URL, "Normal Operation")
             if data_point:
                 collected_data.append(data_point)
-            time.sleep(MEASUREMENT_INTERVAL)
+            next_measurement += MEASUREMENT_INTERVAL
+            sleep_until(next_measurement)
 
         # Step 2: Initiate "heatwave" by using our new weather event endpoint
         logger.info("Starting simulated heatwave for tomato greenhouse...")
@@ -227,10 +285,11 @@ def main():
             }
             
             # Send request to the new endpoint
-            heatwave_resp = requests.post(
+            heatwave_resp = SESSION.post(
                 f"{DATA_SERVER_URL}/generate-event",
                 json=heatwave_payload,
-                headers={"X-API-Key": "INSECURE_API_KEY"}
+                headers={"X-API-Key": "INSECURE_API_KEY"},
+                timeout=REQUEST_TIMEOUT
             )
             
             if heatwave_resp.status_code == 200:
@@ -245,11 +304,13 @@ def main():
             logger.error(f"Error activating heatwave event: {e}")
 
         # Step 3: Monitor for 30 seconds as temperature rises
+        next_measurement = time.monotonic()
         for i in range(6):  # 30 seconds of rising heat
             data_point = collect_data_point(logger, SENSOR_URL, DATA_SERVER_URL, "Heatwave")
             if data_point:
                 collected_data.append(data_point)
-            time.sleep(MEASUREMENT_INTERVAL)
+            next_measurement += MEASUREMENT_INTERVAL
+            sleep_until(next_measurement)
 
         # Step 4: Initiate DDoS attack from the sensor
         logger.info("Initiating DDoS attack from sensor...")
@@ -259,10 +320,11 @@ def main():
                 "duration": 60,  # 30 seconds of attack
                 "type": "http"   # HTTP flood attack
             }
-            attack_resp = requests.post(
+            attack_resp = SESSION.post(
                 f"{SENSOR_URL}/botnet/attack",
                 json=payload,
-                auth=ADMIN_CREDS
+                auth=ADMIN_CREDS,
+                timeout=REQUEST_TIMEOUT
             )
             logger.info(f"DDoS attack initiation response: {attack_resp.status_code}")
         except Exception as e:
@@ -272,21 +334,24 @@ def main():
         logger.info("Setting sensor to stuck fault mode...")
         try:
             last_reported_temp = collected_data[-1]["reported_temp"] if collected_data else 25
-            fault_resp = requests.post(
+            fault_resp = SESSION.post(
                 f"{SENSOR_URL}/simulate/fault",
                 json={"fault_mode": "stuck", "value": last_reported_temp, "duration": 60},
-                auth=ADMIN_CREDS
+                auth=ADMIN_CREDS,
+                timeout=REQUEST_TIMEOUT
             )
             logger.info(f"Fault simulation response: {fault_resp.status_code}")
         except Exception as e:
             logger.error(f"Error setting fault mode: {e}")
 
         # Step 6: Continue monitoring as actual temperature rises but reported remains stuck
+        next_measurement = time.monotonic()
         for i in range(12):  # 60 seconds of attack impact
             data_point = collect_data_point(logger, SENSOR_URL, DATA_SERVER_URL, "Attack Active")
             if data_point:
                 collected_data.append(data_point)
-            time.sleep(MEASUREMENT_INTERVAL)
+            next_measurement += MEASUREMENT_INTERVAL
+            sleep_until(next_measurement)
 
         # Generate visualization and save data
         yield_impact = generate_visualization(collected_data, MEASUREMENT_INTERVAL)